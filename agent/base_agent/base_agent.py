@@ -24,9 +24,10 @@ from tools.general_tools import extract_conversation, extract_tool_messages, get
 from tools.price_tools import add_no_trade_record, get_latest_position
 from prompts.agent_prompt import get_agent_system_prompt, STOP_SIGNAL
 try:
-    from prompts.agent_prompt_upbit import get_agent_system_prompt_upbit
+    from prompts.agent_prompt_upbit import get_agent_system_prompt_upbit, get_agent_dynamic_context
 except Exception:
     get_agent_system_prompt_upbit = None
+    get_agent_dynamic_context = None
 
 # Load environment variables
 load_dotenv()
@@ -244,9 +245,13 @@ class BaseAgent:
         
         # Update system prompt
         # Choose prompt based on mode
+        compact_prompt = None
         if self.prompt_mode == "upbit" and get_agent_system_prompt_upbit is not None:
             try:
                 sys_prompt = get_agent_system_prompt_upbit(today_date, self.signature, self.stock_symbols)
+                # UPBIT_PROMPT_COMPACT=true: full rules on the first turn, shorter rule set afterwards
+                if os.getenv("UPBIT_PROMPT_COMPACT", "false").lower() in ("1", "true", "yes"):
+                    compact_prompt = get_agent_system_prompt_upbit(today_date, self.signature, self.stock_symbols, compact=True)
             except TypeError:
                 sys_prompt = get_agent_system_prompt_upbit(today_date, self.signature)
         else:
@@ -257,13 +262,26 @@ class BaseAgent:
             tools=self.tools,
             system_prompt=sys_prompt,
         )
+        compact_agent = None
+        if compact_prompt is not None:
+            compact_agent = create_agent(
+                self.model,
+                tools=self.tools,
+                system_prompt=compact_prompt,
+            )
         
         # Initial user query
         ledger_snapshot = self._get_latest_position_snapshot(today_date)
         ledger_text = ""
         if ledger_snapshot:
             ledger_text = f"\nCurrent ledger snapshot (from position log): {json.dumps(ledger_snapshot, ensure_ascii=False)}"
-        user_query = [{"role": "user", "content": f"Please analyze and update today's ({today_date}) positions.{ledger_text}"}]
+        # Minute-level ticker snapshot goes in the user message so the system prompt prefix stays cacheable
+        dynamic_text = ""
+        if self.prompt_mode == "upbit" and get_agent_dynamic_context is not None:
+            dynamic_context = get_agent_dynamic_context(today_date, await self._prefetch_ticker_snapshot())
+            if dynamic_context:
+                dynamic_text = f"\n{dynamic_context}"
+        user_query = [{"role": "user", "content": f"Please analyze and update today's ({today_date}) positions.{ledger_text}{dynamic_text}"}]
         message = user_query.copy()
         
         # Log initial message
@@ -277,6 +295,9 @@ class BaseAgent:
         while current_step < self.max_steps:
             current_step += 1
             print(f"🔄 Step {current_step}/{self.max_steps}")
+            if current_step == 2 and compact_agent is not None:
+                # The model has seen the full rules on turn 1
+                self.agent = compact_agent
             
             try:
                 # Call agent
@@ -340,6 +361,20 @@ class BaseAgent:
             print(f"⚠️  Unable to load latest position snapshot: {exc}")
         return {}
     
+    async def _prefetch_ticker_snapshot(self) -> str:
+        """Return the watchlist ticker snapshot from the get_ticker_batch tool ("" when unavailable)."""
+        tool = next((t for t in self.tools or [] if getattr(t, "name", None) == "get_ticker_batch"), None)
+        if tool is None or not self.stock_symbols:
+            return ""
+        try:
+            result = await tool.ainvoke({"symbols": list(self.stock_symbols)})
+        except Exception as exc:
+            print(f"⚠️  Unable to prefetch ticker snapshot: {exc}")
+            return ""
+        if isinstance(result, str):
+            return result
+        return json.dumps(result, ensure_ascii=False, default=str)
+    
     async def _handle_trading_result(self, today_date: str) -> None:
         """Handle trading results"""
         if_trade = get_config_value("IF_TRADE")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Host all MCP tool servers inside a single Python process.
+
+Each tool module keeps its own FastMCP app and port; this only saves the
+per-process interpreter start-up, imports and heap of running them separately.
+Every server runs its own event loop in its own thread, so a sync tool that
+blocks (e.g. a slow Jina request) only stalls the server it belongs to.
+
+Usage:
+  python agent_tools/services_host.py [paper|upbit]   (default: paper)
+"""
+
+import os
+import sys
+import asyncio
+import importlib
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Tool modules live next to this file
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRADE_MODULES = {
+    'paper': 'tool_trade_paper_upbit',
+    'upbit': 'tool_trade_upbit',
+}
+
+
+def service_modules(mode='paper'):
+    """Return (module name, port) pairs for the services hosted in this process."""
+    return [
+        ('tool_math', int(os.getenv('MATH_HTTP_PORT', '8000'))),
+        ('tool_jina_search', int(os.getenv('SEARCH_HTTP_PORT', '8001'))),
+        (TRADE_MODULES[mode], int(os.getenv('TRADE_HTTP_PORT', '8002'))),
+        ('tool_get_price_upbit', int(os.getenv('GETPRICE_HTTP_PORT', '8003'))),
+    ]
+
+
+def _serve(module, port, stopped):
+    try:
+        asyncio.run(module.mcp.run_async(transport="streamable-http", port=port, show_banner=False))
+    except Exception as e:
+        print(f"{module.__name__} on port {port} stopped: {e}")
+    finally:
+        stopped.set()
+
+
+def main(mode='paper'):
+    """Run every service in its own thread; returns once any of them stops."""
+    stopped = threading.Event()
+    # Import up front in the main thread so module-level setup (dotenv, sessions) runs once, in order
+    modules = [(importlib.import_module(name), port) for name, port in service_modules(mode)]
+    for module, port in modules:
+        print(f"Serving {module.mcp.name} ({module.__name__}) on port {port}")
+        threading.Thread(target=_serve, args=(module, port, stopped), name=module.__name__, daemon=True).start()
+    stopped.wait()
+    return 1
+
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'paper'
+    if mode not in TRADE_MODULES:
+        print(f"Unknown mode: {mode} (expected one of: {', '.join(TRADE_MODULES)})")
+        sys.exit(1)
+    try:
+        sys.exit(main(mode))
+    except KeyboardInterrupt:
+        pass
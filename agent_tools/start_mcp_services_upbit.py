@@ -8,22 +8,24 @@ Services:
   - Search: agent_tools/tool_jina_search.py (requires JINA_API_KEY)
   - TradeTools: agent_tools/tool_trade_upbit.py (uses UPBIT_* env)
   - LocalPrices: agent_tools/tool_get_price_upbit.py
+Set MCP_SINGLE_PROCESS=true to host all of them in one interpreter (services_host.py).
 """
 
 import os
 import sys
-import time
 import signal
-import subprocess
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 
+# Service logs are appended across restarts and rotated to <name>.log.1 past this size
+LOG_ROTATE_BYTES = 50 * 1024 * 1024
+
 
 class MCPServiceManager:
     def __init__(self):
         self.services = {}
-        self.running = True
 
         self.ports = {
             'math': int(os.getenv('MATH_HTTP_PORT', '8000')),
@@ -55,18 +57,21 @@ class MCPServiceManager:
             },
         }
 
+        # MCP_SINGLE_PROCESS=true runs every tool inside one interpreter (services_host.py)
+        if os.getenv('MCP_SINGLE_PROCESS', 'false').lower() in ('1', 'true', 'yes'):
+            self.service_configs = {
+                'host': {
+                    'script': 'services_host.py',
+                    'args': ['upbit'],
+                    'name': 'MCP host (Upbit)',
+                    'port': list(self.ports.values()),
+                },
+            }
+
         self.log_dir = Path('../logs')
         self.log_dir.mkdir(exist_ok=True)
 
-        signal.signal(signal.SIGINT, self.signal_handler)
-        signal.signal(signal.SIGTERM, self.signal_handler)
-
-    def signal_handler(self, signum, frame):
-        print("\nStopping all services...")
-        self.stop_all_services()
-        sys.exit(0)
-
-    def start_service(self, service_id, config):
+    async def start_service(self, service_id, config):
         script_path = config['script']
         service_name = config['name']
         port = config['port']
@@ -77,62 +82,82 @@ class MCPServiceManager:
 
         try:
             log_file = self.log_dir / f"{service_id}.log"
-            f = open(log_file, 'w')
-            process = subprocess.Popen(
-                [sys.executable, script_path],
-                stdout=f,
-                stderr=subprocess.STDOUT,
-                cwd=os.getcwd()
-            )
+            if log_file.exists() and log_file.stat().st_size > LOG_ROTATE_BYTES:
+                os.replace(log_file, log_file.with_suffix('.log.1'))
+            # Unbuffered O_APPEND fd: the child writes straight to the kernel
+            fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, str(script_path), *config.get('args', []),
+                    stdout=fd,
+                    stderr=asyncio.subprocess.STDOUT,
+                    cwd=os.getcwd()
+                )
+            finally:
+                os.close(fd)
             self.services[service_id] = {
                 'process': process,
                 'name': service_name,
                 'port': port,
                 'log_file': log_file,
-                'stdout': f,
             }
-            print(f"Started {service_name} (PID: {process.pid}, Port: {port})")
+            port_label = ", ".join(map(str, port)) if isinstance(port, list) else port
+            print(f"Started {service_name} (PID: {process.pid}, Port: {port_label})")
             return True
         except Exception as e:
             print(f"Failed to start {service_name}: {e}")
             return False
 
-    def start_all(self):
+    async def start_all(self):
         print("Starting MCP services (Upbit mode)...")
-        for sid, cfg in self.service_configs.items():
+        await asyncio.gather(*[
             self.start_service(sid, cfg)
+            for sid, cfg in self.service_configs.items()
+        ])
 
-        time.sleep(2)
+        await asyncio.sleep(2)
         print("Services running:")
         for sid, svc in self.services.items():
-            print(f" - {svc['name']}: http://localhost:{svc['port']}  (log: {svc['log_file']})")
+            ports = svc['port'] if isinstance(svc['port'], list) else [svc['port']]
+            urls = ", ".join(f"http://localhost:{p}" for p in ports)
+            print(f" - {svc['name']}: {urls}  (log: {svc['log_file']})")
 
         print("Press Ctrl+C to stop.")
-        self.keepalive()
+        await self.keepalive()
+
+    async def keepalive(self):
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                # Windows: Ctrl+C still arrives as KeyboardInterrupt via asyncio.run
+                pass
 
-    def keepalive(self):
+        waiters = {
+            asyncio.ensure_future(svc['process'].wait()): svc
+            for svc in self.services.values()
+        }
         try:
-            while self.running:
-                time.sleep(1)
-                for sid, svc in list(self.services.items()):
-                    if svc['process'].poll() is not None:
-                        print(f"{svc['name']} exited.")
-                        self.running = False
-                        break
-        except KeyboardInterrupt:
-            pass
+            if waiters:
+                # Wake as soon as any child exits instead of polling
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    print(f"{waiters[waiter]['name']} exited.")
+        except asyncio.CancelledError:
+            print("\nStopping all services...")
         finally:
-            self.stop_all_services()
+            for waiter in waiters:
+                waiter.cancel()
+            await self.stop_all_services()
 
-    def stop_all_services(self):
+    async def stop_all_services(self):
         for sid, svc in self.services.items():
             try:
-                svc['process'].terminate()
-                svc['process'].wait(timeout=5)
-            except Exception:
-                pass
-            try:
-                svc['stdout'].close()
+                if svc['process'].returncode is None:
+                    svc['process'].terminate()
+                await asyncio.wait_for(svc['process'].wait(), timeout=5)
             except Exception:
                 pass
         self.services.clear()
@@ -140,5 +165,7 @@ class MCPServiceManager:
 
 if __name__ == '__main__':
     manager = MCPServiceManager()
-    manager.start_all()
-
+    try:
+        asyncio.run(manager.start_all())
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,22 @@
 from fastmcp import FastMCP
 from pathlib import Path
+import asyncio
+import functools
 from typing import Dict, Any, List, Optional
 import os
+import re
+from datetime import date as _date
+from operator import itemgetter
 from dotenv import load_dotenv
 load_dotenv()
 
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 mcp = FastMCP("LocalPrices")
 
@@ -14,6 +24,36 @@ UPBIT_API_BASE = os.environ.get("UPBIT_API_BASE", "https://api.upbit.com")
 QUOTE_CCY = os.environ.get("UPBIT_QUOTE", "KRW").upper()
 
 
+def _build_session() -> requests.Session:
+    """Shared keep-alive session so Upbit calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip",
+        "User-Agent": "mcp-upbit/1.0",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+_SESSION = _build_session()
+
+
+def _json_body(resp: requests.Response) -> Any:
+    """Decode a response body with orjson when available (falls back to resp.json())."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+@functools.lru_cache(maxsize=1024)
 def _normalize_market(symbol: str) -> str:
     s = symbol.strip().upper()
     if "-" in s:
@@ -58,11 +98,18 @@ def _bar_count_from_env(default: int = 30) -> int:
     return default
 
 
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
 def _validate_date(date_str: str) -> None:
+    # Must reject impossible dates (e.g. 2025-02-30): _get_daily_candle falls back to the latest candle
+    m = _DATE_RE.fullmatch(date_str)
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError as exc:
-        raise ValueError("date must be in YYYY-MM-DD format") from exc
+        if not m:
+            raise ValueError
+        _date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        raise ValueError("date must be in YYYY-MM-DD format") from None
 
 
 def _get_daily_candle(symbol: str, date: str) -> Dict[str, Any] | None:
@@ -75,9 +122,9 @@ def _get_daily_candle(symbol: str, date: str) -> Dict[str, Any] | None:
     to_ts = f"{date} 23:59:59"
     params = {"market": market, "to": to_ts, "count": 1}
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _SESSION.get(url, params=params, timeout=10)
         if resp.status_code == 200:
-            arr = resp.json()
+            arr = _json_body(resp)
             if isinstance(arr, list) and arr:
                 return arr[0]
     except Exception:
@@ -85,9 +132,9 @@ def _get_daily_candle(symbol: str, date: str) -> Dict[str, Any] | None:
 
     # Fallback to latest
     try:
-        resp = requests.get(url, params={"market": market, "count": 1}, timeout=10)
+        resp = _SESSION.get(url, params={"market": market, "count": 1}, timeout=10)
         if resp.status_code == 200:
-            arr = resp.json()
+            arr = _json_body(resp)
             if isinstance(arr, list) and arr:
                 return arr[0]
     except Exception:
@@ -119,10 +166,10 @@ def _get_minutes_candles(symbol: str, minutes: int = 10, count: int = 30, to: Op
     if to:
         params["to"] = to
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _SESSION.get(url, params=params, timeout=10)
         if resp.status_code != 200:
             return []
-        data = resp.json()
+        data = _json_body(resp)
         return data if isinstance(data, list) else []
     except Exception:
         return []
@@ -162,8 +209,40 @@ def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     }
 
 
+_CANDLE_KEYS = ("time", "open", "high", "low", "close", "volume")
+_CANDLE_FIELDS = itemgetter(
+    "candle_date_time_kst", "opening_price", "high_price", "low_price", "trade_price", "candle_acc_trade_volume"
+)
+
+
+def _format_candle(c: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return dict(zip(_CANDLE_KEYS, _CANDLE_FIELDS(c)))
+    except KeyError:
+        return {
+            "time": c.get("candle_date_time_kst") or c.get("candle_date_time_utc"),
+            "open": c.get("opening_price"),
+            "high": c.get("high_price"),
+            "low": c.get("low_price"),
+            "close": c.get("trade_price"),
+            "volume": c.get("candle_acc_trade_volume"),
+        }
+
+
+def _minutes_payload(symbol: str, minutes: int, count: int, to: str | None, raw: bool = False) -> Dict[str, Any]:
+    candles = _get_minutes_candles(symbol, minutes=minutes, count=count, to=to)
+    formatted = candles if raw else [_format_candle(c) for c in candles]
+    return {
+        "symbol": _normalize_market(symbol),
+        "minutes": int(minutes),
+        "count": int(count),
+        "to": to,
+        "candles": formatted,
+    }
+
+
 @mcp.tool()
-def get_price_minutes(symbol: str, minutes: int | None = None, count: int | None = None, to: str | None = None) -> Dict[str, Any]:
+def get_price_minutes(symbol: str, minutes: int | None = None, count: int | None = None, to: str | None = None, raw: bool = False) -> Dict[str, Any]:
     """Return recent minute candles for a symbol.
 
     Args:
@@ -171,6 +250,7 @@ def get_price_minutes(symbol: str, minutes: int | None = None, count: int | None
         minutes: 1,3,5,10,15,30,60,240 (default 10)
         count: number of candles to fetch (default 30)
         to: optional end time 'YYYY-MM-DD HH:MM:SS' (KST)
+        raw: return Upbit's candle objects untouched instead of the compact OHLCV shape
 
     Returns:
         { symbol, minutes, count, to, candles: [ {time, open, high, low, close, volume}... ] }
@@ -178,28 +258,66 @@ def get_price_minutes(symbol: str, minutes: int | None = None, count: int | None
     # If minutes/count not provided by the caller, read from env
     minutes = int(minutes) if minutes is not None else _bar_minutes_from_env(10)
     count = int(count) if count is not None else _bar_count_from_env(30)
-    candles = _get_minutes_candles(symbol, minutes=minutes, count=count, to=to)
-    formatted: List[Dict[str, Any]] = []
-    for c in candles:
-        formatted.append({
-            "time": c.get("candle_date_time_kst") or c.get("candle_date_time_utc"),
-            "open": c.get("opening_price"),
-            "high": c.get("high_price"),
-            "low": c.get("low_price"),
-            "close": c.get("trade_price"),
-            "volume": c.get("candle_acc_trade_volume"),
-        })
+    return _minutes_payload(symbol, minutes, count, to, raw)
+
+
+@mcp.tool()
+async def get_price_minutes_many(symbols: List[str] | str, minutes: int | None = None, count: int | None = None, to: str | None = None, raw: bool = False) -> Dict[str, Any]:
+    """Return recent minute candles for several symbols in one call.
+
+    Args:
+        symbols: List of symbols like ["BTC","ETH"] or a comma-separated string.
+        minutes: 1,3,5,10,15,30,60,240 (default 10)
+        count: number of candles per symbol (default 30)
+        to: optional end time 'YYYY-MM-DD HH:MM:SS' (KST)
+        raw: return Upbit's candle objects untouched instead of the compact OHLCV shape
+
+    Returns:
+        { minutes, count, to, results: [ {symbol, minutes, count, to, candles}... ] }
+    """
+    if isinstance(symbols, str):
+        raw_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    else:
+        raw_list = [s for s in (symbols or []) if s and s.strip()]
+    minutes = int(minutes) if minutes is not None else _bar_minutes_from_env(10)
+    count = int(count) if count is not None else _bar_count_from_env(30)
+    # Per-symbol requests share the pooled session and run concurrently
+    results = await asyncio.gather(*[
+        asyncio.to_thread(_minutes_payload, sym, minutes, count, to, raw)
+        for sym in raw_list
+    ])
+    return {"minutes": minutes, "count": count, "to": to, "results": list(results)}
+
+
+def _ticker_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    m = item.get("market", "")
     return {
-        "symbol": _normalize_market(symbol),
-        "minutes": int(minutes),
-        "count": int(count),
-        "to": to,
-        "candles": formatted,
+        "symbol": m.partition("-")[2] or m,
+        "market": m,
+        "trade_price": item.get("trade_price"),
+        "signed_change_rate": item.get("signed_change_rate"),
+        "acc_trade_price_24h": item.get("acc_trade_price_24h"),
+        "status": "ok",
     }
 
 
+def _fetch_ticker_batch(markets: List[str]) -> List[Dict[str, Any]]:
+    """Fetch one /v1/ticker batch (up to 50 markets) and shape per-symbol results."""
+    url = f"{UPBIT_API_BASE}/v1/ticker"
+    try:
+        resp = _SESSION.get(url, params={"markets": ",".join(markets)}, timeout=10)
+        if resp.status_code != 200:
+            # mark all as error
+            status = f"http_{resp.status_code}"
+            return [{"symbol": m.partition("-")[2] or m, "market": m, "status": status} for m in markets]
+        data = _json_body(resp)
+        return [_ticker_row(item) for item in data] if isinstance(data, list) else []
+    except Exception:
+        return [{"symbol": m.partition("-")[2] or m, "market": m, "status": "error"} for m in markets]
+
+
 @mcp.tool()
-def get_ticker_batch(symbols: List[str] | str) -> Dict[str, Any]:
+async def get_ticker_batch(symbols: List[str] | str) -> Dict[str, Any]:
     """Fetch current ticker data for a list of KRW symbols in one call.
 
     Args:
@@ -215,46 +333,19 @@ def get_ticker_batch(symbols: List[str] | str) -> Dict[str, Any]:
     else:
         raw_list = list(symbols or [])
 
-    markets: List[str] = []
-    for s in raw_list:
-        if not s:
-            continue
-        ms = s.strip().upper()
-        markets.append(ms if "-" in ms else f"{QUOTE_CCY}-{ms}")
+    markets: List[str] = [_normalize_market(s) for s in raw_list if s and s.strip()]
 
     results: List[Dict[str, Any]] = []
     if not markets:
         return {"results": results}
 
-    url = f"{UPBIT_API_BASE}/v1/ticker"
-    # batch up to 50 per request
-    for i in range(0, len(markets), 50):
-        batch = markets[i:i+50]
-        try:
-            resp = requests.get(url, params={"markets": ",".join(batch)}, timeout=10)
-            if resp.status_code != 200:
-                # mark all as error
-                for m in batch:
-                    sym = m.split("-", 1)[1] if "-" in m else m
-                    results.append({"symbol": sym, "market": m, "status": f"http_{resp.status_code}"})
-                continue
-            data = resp.json()
-            if isinstance(data, list):
-                for item in data:
-                    m = item.get("market", "")
-                    sym = m.split("-", 1)[1] if "-" in m else m
-                    results.append({
-                        "symbol": sym,
-                        "market": m,
-                        "trade_price": item.get("trade_price"),
-                        "signed_change_rate": item.get("signed_change_rate"),
-                        "acc_trade_price_24h": item.get("acc_trade_price_24h"),
-                        "status": "ok",
-                    })
-        except Exception:
-            for m in batch:
-                sym = m.split("-", 1)[1] if "-" in m else m
-                results.append({"symbol": sym, "market": m, "status": "error"})
+    # batch up to 50 per request; batches are fetched concurrently off the event loop
+    batches = await asyncio.gather(*[
+        asyncio.to_thread(_fetch_ticker_batch, markets[i:i+50])
+        for i in range(0, len(markets), 50)
+    ])
+    for batch in batches:
+        results.extend(batch)
 
     return {"results": results}
 
@@ -1,13 +1,24 @@
 from fastmcp import FastMCP
+import asyncio
+import atexit
+import functools
 import os
 import json
+import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Tuple, Optional
 from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 load_dotenv()
 
@@ -26,8 +37,48 @@ try:
     START_CASH_KRW = float(os.environ.get("START_CASH_KRW", "100000000"))
 except Exception:
     START_CASH_KRW = 100000000.0
+# Ticker price memo window; set PRICE_TTL_MS=0 to always hit Upbit
+try:
+    PRICE_TTL = max(0.0, float(os.environ.get("PRICE_TTL_MS", "500"))) / 1000.0
+except Exception:
+    PRICE_TTL = 0.5
+# fsync every ledger append (off by default; flush alone survives a process crash)
+LEDGER_FSYNC = os.environ.get("UPBIT_JSONL_FSYNC", "0").lower() in ("1", "true", "yes")
+
+
+def _build_session() -> requests.Session:
+    """Shared keep-alive session so Upbit calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip",
+        "User-Agent": "mcp-upbit/1.0",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+_SESSION = _build_session()
+_LEDGER_LOCK = asyncio.Lock()
+_PRICE_CACHE: Dict[str, Tuple[float, float]] = {}
+_PRICE_CACHE_LOCK = threading.Lock()
 
 
+def _json_body(resp: requests.Response) -> Any:
+    """Decode a response body with orjson when available (falls back to resp.json())."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+@functools.lru_cache(maxsize=1024)
 def _normalize_market(symbol: str) -> str:
     s = symbol.strip().upper()
     if "-" in s:
@@ -37,12 +88,28 @@ def _normalize_market(symbol: str) -> str:
 
 def _ticker_price(symbol: str) -> float:
     market = _normalize_market(symbol)
+    if PRICE_TTL > 0:
+        with _PRICE_CACHE_LOCK:
+            hit = _PRICE_CACHE.get(market)
+        if hit and time.monotonic() - hit[0] < PRICE_TTL:
+            return hit[1]
+    px = _fetch_ticker_price(market)
+    # Only memoize real prices so a failed fetch is retried on the next call
+    if PRICE_TTL > 0 and px > 0:
+        with _PRICE_CACHE_LOCK:
+            if len(_PRICE_CACHE) >= 512:
+                _PRICE_CACHE.clear()
+            _PRICE_CACHE[market] = (time.monotonic(), px)
+    return px
+
+
+def _fetch_ticker_price(market: str) -> float:
     url = f"{UPBIT_API_BASE}/v1/ticker"
     try:
-        resp = requests.get(url, params={"markets": market}, timeout=10)
+        resp = _SESSION.get(url, params={"markets": market}, timeout=10)
         if resp.status_code != 200:
             return 0.0
-        data = resp.json()
+        data = _json_body(resp)
         if isinstance(data, list) and data:
             return float(data[0].get("trade_price") or 0.0)
     except Exception:
@@ -50,36 +117,187 @@ def _ticker_price(symbol: str) -> float:
     return 0.0
 
 
+_KNOWN_DIRS: set[str] = set()
+
+
+def _ensure_dir(path: str) -> None:
+    if path in _KNOWN_DIRS:
+        return
+    os.makedirs(path, exist_ok=True)
+    _KNOWN_DIRS.add(path)
+
+
 def _position_path(signature: str) -> str:
     return os.path.join(project_root, "data", "agent_data", signature, "position", "position.jsonl")
 
 
-def _read_last_ext(signature: str) -> Tuple[Dict[str, float], Dict[str, float], float, int]:
-    positions: Dict[str, float] = {}
-    avg_costs: Dict[str, float] = {}
-    realized_pnl = 0.0
-    max_id = -1
-    path = _position_path(signature)
-    if not os.path.exists(path):
-        return positions, avg_costs, realized_pnl, max_id
+# Cold starts resume from position.jsonl.snap, rewritten every N records
+LEDGER_CHECKPOINT_EVERY = 100
+
+# Per-ledger view of the latest record plus how far into the file it has been parsed
+_LEDGER_CACHE: Dict[str, Dict[str, Any]] = {}
+# Trades update the cache from to_thread workers while get_balance reads it on another thread
+_LEDGER_CACHE_LOCK = threading.RLock()
+
+
+def _empty_ledger_state() -> Dict[str, Any]:
+    return {"size": 0, "mtime": 0.0, "last_id": -1, "positions": {}, "avg_costs": {}, "realized_pnl": 0.0}
+
+
+def _apply_record(state: Dict[str, Any], doc: Dict[str, Any]) -> None:
+    current_id = int(doc.get("id", -1))
+    if current_id > state["last_id"]:
+        state["last_id"] = current_id
+        state["positions"] = dict(doc.get("positions", {}) or {})
+        state["avg_costs"] = dict(doc.get("avg_costs", {}) or {})
+        state["realized_pnl"] = float(doc.get("realized_pnl", 0.0) or 0.0)
+
+
+def _ledger_state(path: str) -> Dict[str, Any]:
+    """Return cached latest-record state, parsing only bytes appended since the last look."""
+    with _LEDGER_CACHE_LOCK:
+        try:
+            st = os.stat(path)
+        except OSError:
+            _LEDGER_CACHE.pop(path, None)
+            return _empty_ledger_state()
+        state = _LEDGER_CACHE.get(path)
+        if state is not None and st.st_size == state["size"] and st.st_mtime == state["mtime"]:
+            return state
+        if state is None:
+            # Cold start: resume from the checkpoint when it still matches the file
+            state = _load_ledger_checkpoint(path, st.st_size) or _empty_ledger_state()
+        elif st.st_size <= state["size"]:
+            # The file was truncated/rewritten in place: rebuild from scratch
+            state = _empty_ledger_state()
+        try:
+            with open(path, "rb") as f:
+                f.seek(state["size"])
+                chunk = f.read()
+        except Exception:
+            return state
+        consumed = 0
+        for line in chunk.splitlines(keepends=True):
+            complete = line.endswith(b"\n")
+            if not line.strip():
+                consumed += len(line)
+                continue
+            try:
+                doc = orjson.loads(line) if orjson is not None else json.loads(line)
+            except Exception:
+                if not complete:
+                    # Likely a record still being written; pick it up next time
+                    break
+                consumed += len(line)
+                continue
+            _apply_record(state, doc)
+            consumed += len(line)
+        state["size"] += consumed
+        state["mtime"] = st.st_mtime
+        _LEDGER_CACHE[path] = state
+        return state
+
+
+def _load_ledger_checkpoint(path: str, ledger_size: int) -> Optional[Dict[str, Any]]:
+    """Load the periodic ledger checkpoint if the ledger prefix it covers is unchanged."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    doc = json.loads(line)
-                except Exception:
-                    continue
-                current_id = int(doc.get("id", -1))
-                if current_id > max_id:
-                    max_id = current_id
-                    positions = doc.get("positions", {}) or {}
-                    avg_costs = doc.get("avg_costs", {}) or {}
-                    realized_pnl = float(doc.get("realized_pnl", 0.0) or 0.0)
+        with open(path + ".snap", "rb") as f:
+            raw = f.read()
+        snap = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        size = int(snap["size"])
+        tail = bytes.fromhex(snap["tail"])
+        if not 0 < size <= ledger_size or not tail:
+            return None
+        with open(path, "rb") as f:
+            f.seek(size - len(tail))
+            if f.read(len(tail)) != tail:
+                return None
+        return {
+            "size": size,
+            "mtime": 0.0,
+            "last_id": int(snap["last_id"]),
+            "positions": dict(snap.get("positions") or {}),
+            "avg_costs": dict(snap.get("avg_costs") or {}),
+            "realized_pnl": float(snap.get("realized_pnl") or 0.0),
+        }
+    except Exception:
+        return None
+
+
+def _save_ledger_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, state["size"] - 64))
+            tail = f.read(min(64, state["size"]))
+        snap = {
+            "size": state["size"],
+            "tail": tail.hex(),
+            "last_id": state["last_id"],
+            "positions": state["positions"],
+            "avg_costs": state["avg_costs"],
+            "realized_pnl": state["realized_pnl"],
+        }
+        data = orjson.dumps(snap) if orjson is not None else json.dumps(snap).encode("utf-8")
+        tmp = path + ".snap.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path + ".snap")
     except Exception:
         pass
-    return positions, avg_costs, realized_pnl, max_id
+
+
+def _read_last_ext(signature: str) -> Tuple[Dict[str, float], Dict[str, float], float, int]:
+    with _LEDGER_CACHE_LOCK:
+        state = _ledger_state(_position_path(signature))
+        return dict(state["positions"]), dict(state["avg_costs"]), state["realized_pnl"], state["last_id"]
+
+
+# Append handles kept open per ledger path, plus a lock per path to serialize writers
+_LEDGER_FH: Dict[str, Any] = {}
+_LEDGER_LOCKS: Dict[str, threading.Lock] = {}
+_LEDGER_LOCKS_GUARD = threading.Lock()
+
+
+def _ledger_lock(path: str) -> threading.Lock:
+    with _LEDGER_LOCKS_GUARD:
+        return _LEDGER_LOCKS.setdefault(path, threading.Lock())
+
+
+def _ledger_fh(path: str):
+    fh = _LEDGER_FH.get(path)
+    if fh is not None:
+        try:
+            # Reuse the handle only while it still points at the file on disk
+            if os.fstat(fh.fileno()).st_ino == os.stat(path).st_ino:
+                return fh
+        except OSError:
+            pass
+        try:
+            fh.close()
+        except Exception:
+            pass
+    try:
+        fh = open(path, "ab", buffering=1 << 16)
+    except FileNotFoundError:
+        # Ledger directory was removed while running (e.g. a data/agent_data reset): re-create it
+        directory = os.path.dirname(path)
+        _KNOWN_DIRS.discard(directory)
+        _ensure_dir(directory)
+        fh = open(path, "ab", buffering=1 << 16)
+    _LEDGER_FH[path] = fh
+    return fh
+
+
+def _close_ledger_files() -> None:
+    for fh in _LEDGER_FH.values():
+        try:
+            fh.close()
+        except Exception:
+            pass
+    _LEDGER_FH.clear()
+
+
+atexit.register(_close_ledger_files)
 
 
 def _write_snapshot(
@@ -91,8 +309,25 @@ def _write_snapshot(
     realized_pnl: Optional[float] = None,
 ) -> Dict[str, Any]:
     path = _position_path(signature)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    _, _, _, last_id = _read_last_ext(signature)
+    _ensure_dir(os.path.dirname(path))
+    with _ledger_lock(path):
+        return _append_snapshot(path, today_date, positions, this_action, avg_costs, realized_pnl)
+
+
+def _append_snapshot(
+    path: str,
+    today_date: str,
+    positions: Dict[str, float],
+    this_action: Dict[str, Any],
+    avg_costs: Optional[Dict[str, float]],
+    realized_pnl: Optional[float],
+) -> Dict[str, Any]:
+    try:
+        pre_size = os.stat(path).st_size
+    except OSError:
+        pre_size = 0
+    # The cache stats the file, so appends by other writers (no-trade records, registration) are picked up
+    last_id = _ledger_state(path)["last_id"]
     record = {
         "date": today_date,
         "timestamp": _current_timestamp_kst(),
@@ -104,8 +339,29 @@ def _write_snapshot(
         record["avg_costs"] = avg_costs
     if isinstance(realized_pnl, (int, float)):
         record["realized_pnl"] = realized_pnl
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if orjson is not None:
+        line = orjson.dumps(record) + b"\n"
+    else:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    fh = _ledger_fh(path)
+    fh.write(line)
+    fh.flush()
+    if LEDGER_FSYNC:
+        os.fsync(fh.fileno())
+    # Record our own append unless another writer slipped in between
+    try:
+        st = os.stat(path)
+        if st.st_size == pre_size + len(line):
+            with _LEDGER_CACHE_LOCK:
+                state = _LEDGER_CACHE.get(path)
+                if state is not None and state["size"] == pre_size:
+                    _apply_record(state, record)
+                    state["size"] = st.st_size
+                    state["mtime"] = st.st_mtime
+                    if record["id"] % LEDGER_CHECKPOINT_EVERY == 0:
+                        _save_ledger_checkpoint(path, state)
+    except OSError:
+        pass
     return record
 
 
@@ -116,9 +372,9 @@ def _current_timestamp_kst() -> str:
 
 def _bootstrap_if_missing(signature: str, today_date: str) -> None:
     path = _position_path(signature)
+    # Not trusting _LEDGER_CACHE here: the ledger may have been deleted since it was cached
     if os.path.exists(path):
         return
-    os.makedirs(os.path.dirname(path), exist_ok=True)
     init_positions = {"CASH": START_CASH_KRW}
     _write_snapshot(
         signature,
@@ -130,24 +386,46 @@ def _bootstrap_if_missing(signature: str, today_date: str) -> None:
     )
 
 
+# (path, mtime_ns, size, parsed dict) of the last runtime env file read
+_ENV_CACHE: Optional[Tuple[str, int, int, Dict[str, Any]]] = None
+
+
+def _load_runtime_env(env_path: str) -> Dict[str, Any]:
+    global _ENV_CACHE
+    try:
+        st = os.stat(env_path)
+    except OSError:
+        return {}
+    cache = _ENV_CACHE
+    if cache is not None and cache[:3] == (env_path, st.st_mtime_ns, st.st_size):
+        return cache[3]
+    try:
+        with open(env_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        data = {}
+    _ENV_CACHE = (env_path, st.st_mtime_ns, st.st_size, data)
+    return data
+
+
 def _get_config_value(key: str, default=None):
     # local helper to avoid dependency on tools.general_tools
     env_path = os.environ.get("RUNTIME_ENV_PATH")
-    if env_path and os.path.exists(env_path):
-        try:
-            with open(env_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict) and key in data:
-                    return data[key]
-        except Exception:
-            pass
+    if env_path:
+        data = _load_runtime_env(env_path)
+        if key in data:
+            return data[key]
     return os.getenv(key, default)
 
 
 def _write_config_value(key: str, value: Any):
+    global _ENV_CACHE
     env_path = os.environ.get("RUNTIME_ENV_PATH")
     if not env_path:
         return
+    _ENV_CACHE = None
     current = {}
     if os.path.exists(env_path):
         try:
@@ -163,16 +441,39 @@ def _write_config_value(key: str, value: Any):
         pass
 
 
-@mcp.tool()
-def buy(symbol: str, amount: Optional[float] = None, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
-    """Paper buy order using local ledger and Upbit public prices."""
+def _mark_traded() -> None:
+    # Written before the tool returns: BaseAgent reads IF_TRADE right after the session ends
+    if _get_config_value("IF_TRADE") is True:
+        return
+    _write_config_value("IF_TRADE", True)
+
+
+@dataclass
+class Ctx:
+    signature: str
+    today_date: str
+    positions: Dict[str, float]
+    avg_costs: Dict[str, float]
+    realized_pnl: float
+
+
+def _load_ctx() -> Optional[Ctx]:
+    """Resolve SIGNATURE/TODAY_DATE once, bootstrap the ledger and load its latest record."""
     signature = _get_config_value("SIGNATURE")
     if signature is None:
-        return {"error": "SIGNATURE is not set"}
+        return None
     today_date = _get_config_value("TODAY_DATE") or time.strftime("%Y-%m-%d")
-
     _bootstrap_if_missing(signature, today_date)
     positions, avg_costs, realized_pnl, _ = _read_last_ext(signature)
+    return Ctx(signature, today_date, positions, avg_costs, realized_pnl)
+
+
+def _buy(symbol: str, amount: Optional[float], price: float | None, market_order: bool) -> Dict[str, Any]:
+    ctx = _load_ctx()
+    if ctx is None:
+        return {"error": "SIGNATURE is not set"}
+    signature, today_date = ctx.signature, ctx.today_date
+    positions, avg_costs, realized_pnl = ctx.positions, ctx.avg_costs, ctx.realized_pnl
     cash = float(positions.get("CASH", 0.0) or 0.0)
     coin = symbol.strip().upper().split("-")[-1]
     market = _normalize_market(symbol)
@@ -225,7 +526,7 @@ def buy(symbol: str, amount: Optional[float] = None, price: float | None = None,
     else:
         avg_costs[coin] = fill_price
 
-    _write_config_value("IF_TRADE", True)
+    _mark_traded()
     snapshot = _write_snapshot(
         signature,
         today_date,
@@ -253,16 +554,12 @@ def buy(symbol: str, amount: Optional[float] = None, price: float | None = None,
     }
 
 
-@mcp.tool()
-def sell(symbol: str, amount: float, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
-    """Paper sell order using local ledger and Upbit public prices."""
-    signature = _get_config_value("SIGNATURE")
-    if signature is None:
+def _sell(symbol: str, amount: float, price: float | None, market_order: bool) -> Dict[str, Any]:
+    ctx = _load_ctx()
+    if ctx is None:
         return {"error": "SIGNATURE is not set"}
-    today_date = _get_config_value("TODAY_DATE") or time.strftime("%Y-%m-%d")
-
-    _bootstrap_if_missing(signature, today_date)
-    positions, avg_costs, realized_pnl, _ = _read_last_ext(signature)
+    signature, today_date = ctx.signature, ctx.today_date
+    positions, avg_costs, realized_pnl = ctx.positions, ctx.avg_costs, ctx.realized_pnl
     coin = symbol.strip().upper().split("-")[-1]
     market = _normalize_market(symbol)
 
@@ -295,7 +592,7 @@ def sell(symbol: str, amount: float, price: float | None = None, market_order: b
     if positions[coin] <= 0:
         avg_costs[coin] = 0.0
 
-    _write_config_value("IF_TRADE", True)
+    _mark_traded()
     snapshot = _write_snapshot(
         signature,
         today_date,
@@ -323,15 +620,28 @@ def sell(symbol: str, amount: float, price: float | None = None, market_order: b
     }
 
 
+@mcp.tool()
+async def buy(symbol: str, amount: Optional[float] = None, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
+    """Paper buy order using local ledger and Upbit public prices."""
+    # Ledger read-modify-write runs off the event loop; the lock keeps concurrent orders serialized.
+    async with _LEDGER_LOCK:
+        return await asyncio.to_thread(_buy, symbol, amount, price, market_order)
+
+
+@mcp.tool()
+async def sell(symbol: str, amount: float, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
+    """Paper sell order using local ledger and Upbit public prices."""
+    async with _LEDGER_LOCK:
+        return await asyncio.to_thread(_sell, symbol, amount, price, market_order)
+
+
 @mcp.tool()
 def get_balance() -> Dict[str, Any]:
     """Return paper ledger balances (no real API calls)."""
-    signature = _get_config_value("SIGNATURE")
-    if signature is None:
+    ctx = _load_ctx()
+    if ctx is None:
         return {"error": "SIGNATURE is not set"}
-    today_date = _get_config_value("TODAY_DATE") or time.strftime("%Y-%m-%d")
-    _bootstrap_if_missing(signature, today_date)
-    positions, avg_costs, realized_pnl, _ = _read_last_ext(signature)
+    positions, avg_costs, realized_pnl = ctx.positions, ctx.avg_costs, ctx.realized_pnl
     cash = float(positions.get("CASH", 0.0) or 0.0)
     held_coins = []
     for k, v in (positions or {}).items():
@@ -1,19 +1,30 @@
 from fastmcp import FastMCP
+import asyncio
+import atexit
+import functools
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
-import uuid
 import time
 import json
+import base64
 import hashlib
+import hmac
+import secrets
 from datetime import datetime, timezone, timedelta
-from urllib.parse import urlencode
-from typing import Dict, Any, Tuple, Optional
+from urllib.parse import quote_plus
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Optional
 
-import requests
-import jwt
 import sys
+import threading
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+if TYPE_CHECKING:
+    import requests
 
 # Add project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -27,7 +38,10 @@ mcp = FastMCP("TradeTools")
 
 
 UPBIT_API_BASE = os.environ.get("UPBIT_API_BASE", "https://api.upbit.com")
+_ACCOUNTS_URL = f"{UPBIT_API_BASE}/v1/accounts"
+_ORDERS_URL = f"{UPBIT_API_BASE}/v1/orders"
 QUOTE_CCY = os.environ.get("UPBIT_QUOTE", "KRW").upper()
+_PREFIX = QUOTE_CCY + "-"
 DRY_RUN = os.environ.get("UPBIT_DRY_RUN", "true").lower() not in ("false", "0", "no")
 try:
     FEE_RATE = float(os.environ.get("FEE_RATE", "0.0005"))  # 0.05% default
@@ -40,7 +54,56 @@ try:
 except Exception:
     MAX_MARKET_BUY_KRW = 0.0
 
+# fsync position.jsonl after every append (off by default; flush still hands data to the OS)
+LEDGER_FSYNC = os.environ.get("UPBIT_JSONL_FSYNC", "0").lower() in ("1", "true", "yes")
+
+
+def _build_session() -> "requests.Session":
+    """Shared keep-alive session so Upbit calls reuse TCP/TLS connections."""
+    # Imported here so starting the MCP worker does not pay for requests/urllib3
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    # No transport-level retries: a resent request would carry the same signed JWT nonce,
+    # which Upbit rejects. _get retries itself and re-signs each attempt; orders are never resubmitted.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=0, raise_on_status=False))
+    session.mount("https://", adapter)
+    return session
+
+
+_RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+_GET_RETRIES = 2
+_RETRY_BACKOFF = 0.2
+
 
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _session() -> "requests.Session":
+    global _SESSION
+    if _SESSION is None:
+        # First use can come from several to_thread workers at once
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+# One order at a time: pre/post balance deltas would otherwise interleave.
+_ORDER_LOCK = asyncio.Lock()
+
+
+def _json_body(resp: "requests.Response") -> Any:
+    """Decode a response body with orjson when available (falls back to resp.json())."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+@functools.lru_cache(maxsize=1)
 def _creds() -> Tuple[str, str]:
     access_key = os.environ.get("UPBIT_ACCESS_KEY")
     secret_key = os.environ.get("UPBIT_SECRET_KEY")
@@ -49,62 +112,123 @@ def _creds() -> Tuple[str, str]:
     return access_key, secret_key
 
 
+@functools.lru_cache(maxsize=128)
 def _normalize_market(symbol: str) -> str:
     s = symbol.strip().upper()
-    if "-" in s:
-        return s
-    return f"{QUOTE_CCY}-{s}"
+    return s if "-" in s else _PREFIX + s
+
 
+# Canonical key order for Upbit order/query params; anything else follows in insertion order.
+_PARAM_ORDER = ("market", "side", "ord_type", "volume", "price", "uuids[]", "identifiers[]")
+_SAFE_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.")
 
-def _auth_headers(method: str, path: str, params: Dict[str, Any] | None) -> Dict[str, str]:
+
+def _encode_value(value: Any) -> str:
+    v = str(value)
+    return v if _SAFE_CHARS.issuperset(v) else quote_plus(v)
+
+
+def _encode_params(params: Dict[str, Any] | None) -> bytes:
+    """Encode params once; the same bytes feed query_hash and the request URL."""
+    if not params:
+        return b""
+    keys = [k for k in _PARAM_ORDER if k in params]
+    keys.extend(k for k in params if k not in _PARAM_ORDER)
+    parts = []
+    for k in keys:
+        v = params[k]
+        if isinstance(v, (list, tuple)):
+            parts.extend(f"{k}={_encode_value(item)}" for item in v)
+        else:
+            parts.append(f"{k}={_encode_value(v)}")
+    return "&".join(parts).encode()
+
+
+def _auth_headers(query_string: bytes) -> Dict[str, str]:
+    """Fresh token per request: Upbit rejects a reused nonce with 401, so tokens are never cached."""
     access_key, secret_key = _creds()
+    return _build_auth_headers(access_key, secret_key, query_string)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+_JWT_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+
+
+@functools.lru_cache(maxsize=4)
+def _hmac_base(secret_key: str) -> "hmac.HMAC":
+    # Keyed once; copy() reuses the inner/outer pads instead of re-deriving them per token.
+    return hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+
+
+def _encode_jwt(payload: Dict[str, Any], secret_key: str) -> str:
+    """HS256 JWT equivalent to jwt.encode(payload, secret_key, algorithm="HS256")."""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+    msg = _JWT_HEADER_B64 + b"." + _b64url(body)
+    mac = _hmac_base(secret_key).copy()
+    mac.update(msg)
+    return (msg + b"." + _b64url(mac.digest())).decode()
+
+
+def _build_auth_headers(access_key: str, secret_key: str, query_string: bytes) -> Dict[str, str]:
     payload: Dict[str, Any] = {
         "access_key": access_key,
-        "nonce": str(uuid.uuid4()),
+        "nonce": secrets.token_hex(16),
     }
 
-    if params:
-        query_string = urlencode(params).encode()
-        m = hashlib.sha512()
-        m.update(query_string)
-        query_hash = m.hexdigest()
-        payload["query_hash"] = query_hash
+    if query_string:
+        payload["query_hash"] = hashlib.sha512(query_string).hexdigest()
         payload["query_hash_alg"] = "SHA512"
 
-    token = jwt.encode(payload, secret_key, algorithm="HS256")
+    token = _encode_jwt(payload, secret_key)
     return {"Authorization": f"Bearer {token}"}
 
 
-def _get(url: str, params: Dict[str, Any] | None = None, auth: bool = False) -> requests.Response:
-    headers = {}
-    if auth:
-        headers.update(_auth_headers("GET", url, params))
-    return requests.get(url, headers=headers, params=params, timeout=10)
+def _with_query(url: str, query_string: bytes) -> str:
+    return f"{url}?{query_string.decode()}" if query_string else url
 
 
-def _post(url: str, params: Dict[str, Any]) -> requests.Response:
-    headers = _auth_headers("POST", url, params)
-    return requests.post(url, headers=headers, params=params, timeout=10)
+def _get(url: str, params: Dict[str, Any] | None = None, auth: bool = False) -> "requests.Response":
+    query_string = _encode_params(params)
+    target = _with_query(url, query_string)
+    for attempt in range(_GET_RETRIES + 1):
+        # Signed per attempt so a retry never reuses a nonce
+        headers = _auth_headers(query_string) if auth else {}
+        try:
+            resp = _session().get(target, headers=headers, timeout=10)
+        except OSError:
+            # requests.RequestException subclasses IOError (connection errors, timeouts)
+            if attempt == _GET_RETRIES:
+                raise
+        else:
+            if resp.status_code not in _RETRY_STATUS or attempt == _GET_RETRIES:
+                return resp
+        time.sleep(_RETRY_BACKOFF * (2 ** attempt))
+
+
+def _post(url: str, params: Dict[str, Any]) -> "requests.Response":
+    query_string = _encode_params(params)
+    headers = _auth_headers(query_string)
+    return _session().post(_with_query(url, query_string), headers=headers, timeout=10)
 
 
 def _accounts() -> Dict[str, float]:
-    url = f"{UPBIT_API_BASE}/v1/accounts"
-    resp = _get(url, auth=True)
+    resp = _get(_ACCOUNTS_URL, auth=True)
     resp.raise_for_status()
-    data = resp.json()
-    balances: Dict[str, float] = {}
-    for item in data:
-        currency = item.get("currency")
-        bal = float(item.get("balance", 0))
-        if currency == QUOTE_CCY:
-            balances["CASH"] = bal
-        else:
-            balances[currency] = bal
+    balances: Dict[str, float] = {
+        item.get("currency"): float(item.get("balance", 0) or 0) for item in _json_body(resp)
+    }
+    if QUOTE_CCY in balances:
+        balances["CASH"] = balances.pop(QUOTE_CCY)
     return balances
 
 
 def _submit_order(market: str, side: str, volume: str | None, price: str | None, ord_type: str) -> Dict[str, Any]:
-    url = f"{UPBIT_API_BASE}/v1/orders"
     params: Dict[str, Any] = {
         "market": market,
         "side": side,
@@ -118,39 +242,120 @@ def _submit_order(market: str, side: str, volume: str | None, price: str | None,
     if DRY_RUN:
         return {"dry_run": True, "request": params}
 
-    resp = _post(url, params)
+    resp = _post(_ORDERS_URL, params)
     if resp.status_code >= 400:
         return {"error": f"HTTP {resp.status_code}", "detail": resp.text}
     try:
-        return resp.json()
+        return _json_body(resp)
     except Exception:
         return {"raw": resp.text}
 
 
-def _read_last_ext(signature: str) -> Tuple[Dict[str, float], Dict[str, float], float, int]:
-    """Return (positions, avg_costs, realized_pnl, max_id) from last position record, or defaults."""
-    position_file_path = os.path.join(project_root, "data", "agent_data", signature, "position", "position.jsonl")
-    positions: Dict[str, float] = {}
-    avg_costs: Dict[str, float] = {}
-    realized_pnl: float = 0.0
-    max_id = -1
-    if not os.path.exists(position_file_path):
-        return positions, avg_costs, realized_pnl, max_id
+_TAIL_CHUNK = 4096
+# path -> ((mtime_ns, size), last record)
+_LAST_RECORD_CACHE: Dict[str, Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = {}
+
+
+def _position_path(signature: str) -> str:
+    return os.path.join(project_root, "data", "agent_data", signature, "position", "position.jsonl")
+
+
+def _read_last_line(path: str) -> Optional[Dict[str, Any]]:
+    """Parse the last parseable line of a JSONL file by seeking backwards from the end.
+
+    A truncated or corrupt trailing line (e.g. an interrupted append) is skipped, so the
+    ledger resumes from the last good record instead of resetting cost basis and PnL.
+    """
+    fd = os.open(path, os.O_RDONLY)
     try:
-        with open(position_file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
+        pos = os.lseek(fd, 0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            os.lseek(fd, pos, os.SEEK_SET)
+            buf = os.read(fd, step) + buf
+            lines = buf.split(b"\n")
+            # lines[0] may be cut off by the block boundary until we reach the file start
+            buf = lines[0] if pos > 0 else b""
+            complete = lines[1:] if pos > 0 else lines
+            for line in reversed(complete):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    return orjson.loads(line) if orjson is not None else json.loads(line)
+                except Exception:
                     continue
-                doc = json.loads(line)
-                current_id = int(doc.get("id", -1))
-                if current_id > max_id:
-                    max_id = current_id
-                    positions = doc.get("positions", {}) or {}
-                    avg_costs = doc.get("avg_costs", {}) or {}
-                    realized_pnl = float(doc.get("realized_pnl", 0.0) or 0.0)
+        return None
+    finally:
+        os.close(fd)
+
+
+def _read_last_ext(signature: str) -> Tuple[Dict[str, float], Dict[str, float], float, int]:
+    """Return (positions, avg_costs, realized_pnl, max_id) from last position record, or defaults.
+
+    Records are appended with increasing ids, so only the tail is read.
+    """
+    position_file_path = _position_path(signature)
+    doc: Optional[Dict[str, Any]] = None
+    try:
+        st = os.stat(position_file_path)
+        key = (st.st_mtime_ns, st.st_size)
+        hit = _LAST_RECORD_CACHE.get(position_file_path)
+        if hit is not None and hit[0] == key:
+            doc = hit[1]
+        else:
+            doc = _read_last_line(position_file_path)
+            _LAST_RECORD_CACHE[position_file_path] = (key, doc)
     except Exception:
-        pass
-    return positions, avg_costs, realized_pnl, max_id
+        doc = None
+    if not doc:
+        return {}, {}, 0.0, -1
+    try:
+        return (
+            dict(doc.get("positions", {}) or {}),
+            dict(doc.get("avg_costs", {}) or {}),
+            float(doc.get("realized_pnl", 0.0) or 0.0),
+            int(doc.get("id", -1)),
+        )
+    except Exception:
+        return {}, {}, 0.0, -1
+
+
+_WRITERS: Dict[str, Any] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def _get_writer(path: str):
+    fh = _WRITERS.get(path)
+    if fh is not None:
+        try:
+            # Reuse the handle only while it still points at the file on disk
+            if os.fstat(fh.fileno()).st_ino == os.stat(path).st_ino:
+                return fh
+        except OSError:
+            pass
+        try:
+            fh.close()
+        except Exception:
+            pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fh = open(path, "ab", buffering=64 * 1024)
+    _WRITERS[path] = fh
+    return fh
+
+
+def _close_writers() -> None:
+    for fh in _WRITERS.values():
+        try:
+            fh.close()
+        except Exception:
+            pass
+    _WRITERS.clear()
+
+
+atexit.register(_close_writers)
 
 
 def _write_position_snapshot(
@@ -158,13 +363,12 @@ def _write_position_snapshot(
     today_date: str,
     positions: Dict[str, float],
     this_action: Dict[str, Any],
+    last_id: int,
     avg_costs: Optional[Dict[str, float]] = None,
     realized_pnl: Optional[float] = None,
 ) -> Dict[str, Any]:
-    position_file_path = os.path.join(project_root, "data", "agent_data", signature, "position", "position.jsonl")
-    os.makedirs(os.path.dirname(position_file_path), exist_ok=True)
+    position_file_path = _position_path(signature)
 
-    _, _, _, last_id = _read_last_ext(signature)
     record = {
         "date": today_date,
         "timestamp": _current_timestamp_kst(),
@@ -177,8 +381,27 @@ def _write_position_snapshot(
     if isinstance(realized_pnl, (int, float)):
         record["realized_pnl"] = realized_pnl
 
-    with open(position_file_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if orjson is not None:
+        line = orjson.dumps(record) + b"\n"
+    else:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    with _WRITERS_LOCK:
+        try:
+            pre_size = os.stat(position_file_path).st_size
+        except OSError:
+            pre_size = 0
+        fh = _get_writer(position_file_path)
+        fh.write(line)
+        fh.flush()
+        if LEDGER_FSYNC:
+            os.fsync(fh.fileno())
+        # Prime the tail cache with our own record unless another writer slipped in
+        try:
+            st = os.stat(position_file_path)
+            if st.st_size == pre_size + len(line):
+                _LAST_RECORD_CACHE[position_file_path] = ((st.st_mtime_ns, st.st_size), record)
+        except OSError:
+            pass
     return record
 
 
@@ -187,8 +410,34 @@ def _current_timestamp_kst() -> str:
     return datetime.now(tz=kst).strftime("%Y-%m-%dT%H:%M:%S")
 
 
+def _accounts_or_empty() -> Dict[str, float]:
+    try:
+        return _accounts()
+    except Exception:
+        return {}
+
+
+async def _run_order(
+    signature: str, market: str, order: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, float], Tuple[Dict[str, float], Dict[str, float], float, int]]:
+    """Submit an order bracketed by balance reads; caller holds _ORDER_LOCK.
+
+    Returns (order_result, pre_balances, post_balances, _read_last_ext(signature)).
+    """
+    # Pre-trade balances (to infer deltas and effective price) and the local ledger are independent
+    pre_bal, ledger = await asyncio.gather(
+        asyncio.to_thread(_accounts_or_empty),
+        asyncio.to_thread(_read_last_ext, signature),
+    )
+    result = await asyncio.to_thread(_submit_order, market, **order)
+    # Post-trade balances
+    post_bal = await asyncio.to_thread(_accounts_or_empty)
+    write_config_value("IF_TRADE", True)
+    return result, pre_bal, post_bal, ledger
+
+
 @mcp.tool()
-def buy(symbol: str, amount: Optional[float] = None, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
+async def buy(symbol: str, amount: Optional[float] = None, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
     """Place a buy order on Upbit.
 
     Args:
@@ -206,97 +455,83 @@ def buy(symbol: str, amount: Optional[float] = None, price: float | None = None,
 
     market = _normalize_market(symbol)
 
-    # Pre-trade balances (to infer deltas and effective price)
-    try:
-        pre_bal = _accounts()
-    except Exception:
-        pre_bal = {}
-
-    try:
-        if market_order:
-            if price is None:
-                return {"error": "For market buy, 'price' must be the KRW amount to spend"}
-            # Safety cap (if configured)
-            try:
-                req_krw = float(price)
-            except Exception:
-                return {"error": "price must be numeric KRW for market buy", "price": price}
-            if MAX_MARKET_BUY_KRW and req_krw > MAX_MARKET_BUY_KRW:
-                return {
-                    "error": "requested KRW exceeds UPBIT_MAX_BUY_KRW",
-                    "requested_krw": req_krw,
-                    "limit": MAX_MARKET_BUY_KRW,
-                }
-            result = _submit_order(market, side="bid", volume=None, price=str(req_krw), ord_type="price")
-        else:
-            if price is None:
-                return {"error": "Limit buy requires 'price'"}
-            result = _submit_order(market, side="bid", volume=str(amount), price=str(price), ord_type="limit")
-    except Exception as e:
-        return {"error": str(e)}
-
-    # Post-trade balances
-    try:
-        post_bal = _accounts()
-    except Exception:
-        post_bal = {}
-
-    write_config_value("IF_TRADE", True)
-
-    # Infer deltas and update avg costs (only if balances changed)
-    coin = symbol.strip().upper().split("-")[-1]
-    pre_qty = float(pre_bal.get(coin, 0.0) or 0.0)
-    post_qty = float(post_bal.get(coin, 0.0) or 0.0)
-    delta_qty = post_qty - pre_qty
-    pre_cash = float(pre_bal.get("CASH", 0.0) or 0.0)
-    post_cash = float(post_bal.get("CASH", 0.0) or 0.0)
-    delta_cash = post_cash - pre_cash  # expect negative on buy
-
-    prev_positions, prev_avg_costs, prev_realized, _ = _read_last_ext(signature)
-    avg_costs = dict(prev_avg_costs)
-    realized_pnl = float(prev_realized)
-
-    requested_krw = None
-    krw_spent = None
-    coin_delta = None
     if market_order:
-        # For market buy, 'amount' is not used by the exchange; KRW is taken from 'price'.
+        if price is None:
+            return {"error": "For market buy, 'price' must be the KRW amount to spend"}
+        # Safety cap (if configured)
         try:
-            requested_krw = float(price) if price is not None else None
+            req_krw = float(price)
         except Exception:
-            requested_krw = None
-
-    if delta_qty > 0 and delta_cash < 0:
-        krw_spent = -delta_cash  # KRW spent including fee
-        coin_delta = delta_qty
-        effective_price = krw_spent / delta_qty if delta_qty else 0.0
-        prev_avg = float(prev_avg_costs.get(coin, 0.0) or 0.0)
-        new_qty = post_qty
-        if new_qty > 0:
-            avg_costs[coin] = (prev_avg * pre_qty + effective_price * delta_qty) / new_qty
-        else:
-            avg_costs[coin] = effective_price
-
-    this_action = {
-        "action": "buy",
-        "symbol": coin,
-        # For market orders, 'amount' is not meaningful; keep for compatibility, else None
-        "amount": (float(amount) if (amount is not None and not market_order) else None),
-        "market_order": bool(market_order),
-        "requested_krw": requested_krw,
-        "krw_spent": krw_spent,
-        "coin_delta": coin_delta,
-        "fee_rate": FEE_RATE,
-    }
-
-    snapshot = _write_position_snapshot(
-        signature,
-        today_date,
-        positions=post_bal or pre_bal,
-        this_action=this_action,
-        avg_costs=avg_costs if avg_costs else None,
-        realized_pnl=realized_pnl,
-    )
+            return {"error": "price must be numeric KRW for market buy", "price": price}
+        if MAX_MARKET_BUY_KRW and req_krw > MAX_MARKET_BUY_KRW:
+            return {
+                "error": "requested KRW exceeds UPBIT_MAX_BUY_KRW",
+                "requested_krw": req_krw,
+                "limit": MAX_MARKET_BUY_KRW,
+            }
+        order = {"side": "bid", "volume": None, "price": str(req_krw), "ord_type": "price"}
+    else:
+        if price is None:
+            return {"error": "Limit buy requires 'price'"}
+        order = {"side": "bid", "volume": str(amount), "price": str(price), "ord_type": "limit"}
+
+    async with _ORDER_LOCK:
+        try:
+            result, pre_bal, post_bal, ledger = await _run_order(signature, market, order)
+        except Exception as e:
+            return {"error": str(e)}
+        prev_positions, prev_avg_costs, prev_realized, last_id = ledger
+
+        # Infer deltas and update avg costs (only if balances changed)
+        coin = symbol.strip().upper().split("-")[-1]
+        pre_qty = float(pre_bal.get(coin, 0.0) or 0.0)
+        post_qty = float(post_bal.get(coin, 0.0) or 0.0)
+        delta_qty = post_qty - pre_qty
+        pre_cash = float(pre_bal.get("CASH", 0.0) or 0.0)
+        post_cash = float(post_bal.get("CASH", 0.0) or 0.0)
+        delta_cash = post_cash - pre_cash  # expect negative on buy
+
+        avg_costs = dict(prev_avg_costs)
+        realized_pnl = float(prev_realized)
+
+        # For market buy, 'amount' is not used by the exchange; KRW is taken from 'price' (validated above).
+        requested_krw = req_krw if market_order else None
+        krw_spent = None
+        coin_delta = None
+
+        if delta_qty > 0 and delta_cash < 0:
+            krw_spent = -delta_cash  # KRW spent including fee
+            coin_delta = delta_qty
+            effective_price = krw_spent / delta_qty if delta_qty else 0.0
+            prev_avg = float(prev_avg_costs.get(coin, 0.0) or 0.0)
+            new_qty = post_qty
+            if new_qty > 0:
+                avg_costs[coin] = (prev_avg * pre_qty + effective_price * delta_qty) / new_qty
+            else:
+                avg_costs[coin] = effective_price
+
+        this_action = {
+            "action": "buy",
+            "symbol": coin,
+            # For market orders, 'amount' is not meaningful; keep for compatibility, else None
+            "amount": (float(amount) if (amount is not None and not market_order) else None),
+            "market_order": bool(market_order),
+            "requested_krw": requested_krw,
+            "krw_spent": krw_spent,
+            "coin_delta": coin_delta,
+            "fee_rate": FEE_RATE,
+        }
+
+        snapshot = await asyncio.to_thread(
+            _write_position_snapshot,
+            signature,
+            today_date,
+            positions=post_bal or pre_bal,
+            this_action=this_action,
+            last_id=last_id,
+            avg_costs=avg_costs if avg_costs else None,
+            realized_pnl=realized_pnl,
+        )
 
     return {
         "order_result": result,
@@ -309,7 +544,7 @@ def buy(symbol: str, amount: Optional[float] = None, price: float | None = None,
 
 
 @mcp.tool()
-def sell(symbol: str, amount: float, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
+async def sell(symbol: str, amount: float, price: float | None = None, market_order: bool = True) -> Dict[str, Any]:
     """Place a sell order on Upbit.
 
     Args:
@@ -327,75 +562,66 @@ def sell(symbol: str, amount: float, price: float | None = None, market_order: b
 
     market = _normalize_market(symbol)
 
-    # Pre-trade balances
-    try:
-        pre_bal = _accounts()
-    except Exception:
-        pre_bal = {}
-
-    try:
-        if market_order:
-            result = _submit_order(market, side="ask", volume=str(amount), price=None, ord_type="market")
-        else:
-            if price is None:
-                return {"error": "Limit sell requires 'price'"}
-            result = _submit_order(market, side="ask", volume=str(amount), price=str(price), ord_type="limit")
-    except Exception as e:
-        return {"error": str(e)}
-
-    # Post-trade balances
-    try:
-        post_bal = _accounts()
-    except Exception:
-        post_bal = {}
-
-    write_config_value("IF_TRADE", True)
-
-    coin = symbol.strip().upper().split("-")[-1]
-    pre_qty = float(pre_bal.get(coin, 0.0) or 0.0)
-    post_qty = float(post_bal.get(coin, 0.0) or 0.0)
-    delta_qty = pre_qty - post_qty  # shares sold
-    pre_cash = float(pre_bal.get("CASH", 0.0) or 0.0)
-    post_cash = float(post_bal.get("CASH", 0.0) or 0.0)
-    delta_cash = post_cash - pre_cash  # expect positive on sell
-
-    prev_positions, prev_avg_costs, prev_realized, _ = _read_last_ext(signature)
-    avg_costs = dict(prev_avg_costs)
-    realized_pnl = float(prev_realized)
-
-    proceeds_krw = None
-    coin_delta = None
-    if delta_qty > 0 and delta_cash > 0:
-        proceeds_krw = delta_cash
-        effective_price = proceeds_krw / delta_qty if delta_qty else 0.0
-        prev_avg = float(prev_avg_costs.get(coin, 0.0) or 0.0)
-        # Realized PnL uses avg cost; proceeds already net of fees
-        realized_pnl += proceeds_krw - prev_avg * delta_qty
-        coin_delta = delta_qty
-        # Update avg cost for remaining qty
-        if post_qty <= 0:
-            avg_costs[coin] = 0.0
-        else:
-            avg_costs[coin] = prev_avg  # unchanged for remaining
-
-    this_action = {
-        "action": "sell",
-        "symbol": coin,
-        "amount": float(amount) if amount is not None else None,
-        "market_order": bool(market_order),
-        "proceeds_krw": proceeds_krw,
-        "coin_delta": coin_delta,
-        "fee_rate": FEE_RATE,
-    }
+    if market_order:
+        order = {"side": "ask", "volume": str(amount), "price": None, "ord_type": "market"}
+    else:
+        if price is None:
+            return {"error": "Limit sell requires 'price'"}
+        order = {"side": "ask", "volume": str(amount), "price": str(price), "ord_type": "limit"}
 
-    snapshot = _write_position_snapshot(
-        signature,
-        today_date,
-        positions=post_bal or pre_bal,
-        this_action=this_action,
-        avg_costs=avg_costs if avg_costs else None,
-        realized_pnl=realized_pnl,
-    )
+    async with _ORDER_LOCK:
+        try:
+            result, pre_bal, post_bal, ledger = await _run_order(signature, market, order)
+        except Exception as e:
+            return {"error": str(e)}
+        prev_positions, prev_avg_costs, prev_realized, last_id = ledger
+
+        coin = symbol.strip().upper().split("-")[-1]
+        pre_qty = float(pre_bal.get(coin, 0.0) or 0.0)
+        post_qty = float(post_bal.get(coin, 0.0) or 0.0)
+        delta_qty = pre_qty - post_qty  # shares sold
+        pre_cash = float(pre_bal.get("CASH", 0.0) or 0.0)
+        post_cash = float(post_bal.get("CASH", 0.0) or 0.0)
+        delta_cash = post_cash - pre_cash  # expect positive on sell
+
+        avg_costs = dict(prev_avg_costs)
+        realized_pnl = float(prev_realized)
+
+        proceeds_krw = None
+        coin_delta = None
+        if delta_qty > 0 and delta_cash > 0:
+            proceeds_krw = delta_cash
+            effective_price = proceeds_krw / delta_qty if delta_qty else 0.0
+            prev_avg = float(prev_avg_costs.get(coin, 0.0) or 0.0)
+            # Realized PnL uses avg cost; proceeds already net of fees
+            realized_pnl += proceeds_krw - prev_avg * delta_qty
+            coin_delta = delta_qty
+            # Update avg cost for remaining qty
+            if post_qty <= 0:
+                avg_costs[coin] = 0.0
+            else:
+                avg_costs[coin] = prev_avg  # unchanged for remaining
+
+        this_action = {
+            "action": "sell",
+            "symbol": coin,
+            "amount": float(amount) if amount is not None else None,
+            "market_order": bool(market_order),
+            "proceeds_krw": proceeds_krw,
+            "coin_delta": coin_delta,
+            "fee_rate": FEE_RATE,
+        }
+
+        snapshot = await asyncio.to_thread(
+            _write_position_snapshot,
+            signature,
+            today_date,
+            positions=post_bal or pre_bal,
+            this_action=this_action,
+            last_id=last_id,
+            avg_costs=avg_costs if avg_costs else None,
+            realized_pnl=realized_pnl,
+        )
 
     return {
         "order_result": result,
@@ -407,8 +633,19 @@ def sell(symbol: str, amount: float, price: float | None = None, market_order: b
     }
 
 
+def _local_pnl() -> Tuple[Dict[str, float], float]:
+    try:
+        signature = get_config_value("SIGNATURE")
+        if signature:
+            _, avg_costs, realized_pnl, _ = _read_last_ext(signature)
+            return avg_costs, realized_pnl
+    except Exception:
+        pass
+    return {}, 0.0
+
+
 @mcp.tool()
-def get_balance() -> Dict[str, Any]:
+async def get_balance() -> Dict[str, Any]:
     """Return account balances from Upbit.
 
     Returns
@@ -417,19 +654,13 @@ def get_balance() -> Dict[str, Any]:
     - realized_pnl: cumulative realized PnL from local records (if available)
     """
     try:
-        balances = _accounts()
+        balances, (avg_costs, realized_pnl) = await asyncio.gather(
+            asyncio.to_thread(_accounts),
+            asyncio.to_thread(_local_pnl),
+        )
     except Exception as e:
         return {"error": str(e)}
 
-    try:
-        signature = get_config_value("SIGNATURE")
-        if signature:
-            _, avg_costs, realized_pnl, _ = _read_last_ext(signature)
-        else:
-            avg_costs, realized_pnl = {}, 0.0
-    except Exception:
-        avg_costs, realized_pnl = {}, 0.0
-
     # Convenience fields for LLMs
     try:
         cash = float(balances.get("CASH", 0.0) or 0.0)
@@ -1,14 +1,26 @@
-from typing import Optional
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from pathlib import Path
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 from . import data_access
 
-app = FastAPI(title="AI-Trader Dashboard API", version="0.1.0")
+app = FastAPI(
+    title="AI-Trader Dashboard API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +34,63 @@ STATIC_DIR = Path(__file__).resolve().parent / "static"
 app.mount("/web", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
 
 
+# Serialized bodies for JSONL-backed endpoints, keyed by request args + source file version
+_BODY_CACHE: Dict[Tuple[Any, ...], Tuple[float, bytes]] = {}
+
+
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _file_version(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _etag(version: Optional[Tuple[int, int]]) -> Optional[str]:
+    if version is None:
+        return None
+    return f'"{version[0]:x}-{version[1]:x}"'
+
+
+def _cached_json(request: Request, key: Tuple[Any, ...], path: str, build: Callable[[], Any]) -> Response:
+    """Serve build() as JSON, answering 304 when the client already has this file version."""
+    version = _file_version(path)
+    etag = _etag(version)
+    headers = {"ETag": etag, "Cache-Control": "max-age=1"} if etag else None
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    cache_key = key + (version,)
+    now = time.time()
+    hit = _BODY_CACHE.get(cache_key)
+    if hit and now - hit[0] < data_access.CACHE_TTL:
+        body = hit[1]
+    else:
+        body = _dumps(build())
+        if len(_BODY_CACHE) >= 256:
+            _BODY_CACHE.clear()
+        _BODY_CACHE[cache_key] = (now, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _position_file(signature: str) -> str:
+    return f"{data_access._AGENT_DATA_STR}/{signature}/position/position.jsonl"
+
+
+def _metrics_file(signature: str) -> str:
+    return f"{data_access._AGENT_DATA_STR}/{signature}/metrics/metrics.jsonl"
+
+
+def _log_file(signature: str, date: str) -> str:
+    return f"{data_access._AGENT_DATA_STR}/{signature}/log/{date}/log.jsonl"
+
+
 @app.get("/")
 def serve_root():
     index = STATIC_DIR / "index.html"
@@ -46,11 +115,14 @@ def api_signatures():
 
 
 @app.get("/api/positions/{signature}")
-def api_positions(signature: str, limit: Optional[int] = Query(default=100, ge=1, le=5000)):
-    rows = data_access.get_positions(signature, limit=limit)
-    if not rows:
-        raise HTTPException(status_code=404, detail=f"No position data for signature '{signature}'")
-    return {"signature": signature, "count": len(rows), "records": rows}
+def api_positions(request: Request, signature: str, limit: Optional[int] = Query(default=100, ge=1, le=5000)):
+    def _build():
+        rows = data_access.get_positions(signature, limit=limit)
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No position data for signature '{signature}'")
+        return {"signature": signature, "count": len(rows), "records": rows}
+
+    return _cached_json(request, ("positions", signature, limit), _position_file(signature), _build)
 
 
 @app.get("/api/positions/{signature}/latest")
@@ -62,11 +134,14 @@ def api_latest_position(signature: str):
 
 
 @app.get("/api/metrics/{signature}")
-def api_metrics(signature: str, limit: Optional[int] = Query(default=50, ge=1, le=2000)):
-    rows = data_access.get_metrics(signature, limit=limit)
-    if not rows:
-        raise HTTPException(status_code=404, detail=f"No metrics data for signature '{signature}'")
-    return {"signature": signature, "count": len(rows), "records": rows}
+def api_metrics(request: Request, signature: str, limit: Optional[int] = Query(default=50, ge=1, le=2000)):
+    def _build():
+        rows = data_access.get_metrics(signature, limit=limit)
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No metrics data for signature '{signature}'")
+        return {"signature": signature, "count": len(rows), "records": rows}
+
+    return _cached_json(request, ("metrics", signature, limit), _metrics_file(signature), _build)
 
 
 @app.get("/api/metrics/{signature}/latest")
@@ -78,11 +153,14 @@ def api_latest_metrics(signature: str):
 
 
 @app.get("/api/portfolio/{signature}")
-def api_portfolio_timeseries(signature: str, limit: Optional[int] = Query(default=None, ge=1, le=5000)):
-    rows = data_access.portfolio_timeseries(signature, limit=limit)
-    if not rows:
-        raise HTTPException(status_code=404, detail=f"No portfolio data for signature '{signature}'")
-    return {"signature": signature, "count": len(rows), "records": rows}
+def api_portfolio_timeseries(request: Request, signature: str, limit: Optional[int] = Query(default=None, ge=1, le=5000)):
+    def _build():
+        rows = data_access.portfolio_timeseries(signature, limit=limit)
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No portfolio data for signature '{signature}'")
+        return {"signature": signature, "count": len(rows), "records": rows}
+
+    return _cached_json(request, ("portfolio", signature, limit), _position_file(signature), _build)
 
 
 @app.get("/api/logs/{signature}")
@@ -94,11 +172,14 @@ def api_log_dates(signature: str):
 
 
 @app.get("/api/logs/{signature}/{date}")
-def api_logs(signature: str, date: str, limit: Optional[int] = Query(default=None, ge=1, le=5000)):
-    rows = data_access.get_log_records(signature, date, limit=limit)
-    if not rows:
-        raise HTTPException(status_code=404, detail=f"No log records for signature '{signature}' on {date}")
-    return {"signature": signature, "date": date, "count": len(rows), "records": rows}
+def api_logs(request: Request, signature: str, date: str, limit: Optional[int] = Query(default=None, ge=1, le=5000)):
+    def _build():
+        rows = data_access.get_log_records(signature, date, limit=limit)
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No log records for signature '{signature}' on {date}")
+        return {"signature": signature, "date": date, "count": len(rows), "records": rows}
+
+    return _cached_json(request, ("logs", signature, date, limit), _log_file(signature, date), _build)
 
 
 @app.get("/api/holdings/{signature}")
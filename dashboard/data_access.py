@@ -1,83 +1,408 @@
+import functools
 import json
 import os
+import sqlite3
+import threading
 import time
+from array import array
+from collections import OrderedDict
+from datetime import date as _date, datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 AGENT_DATA_DIR = REPO_ROOT / "data" / "agent_data"
 WATCHLIST_FILE = REPO_ROOT / "data" / "watchlist.json"
+PRICE_DB_FILE = REPO_ROOT / "data" / "price_cache.sqlite"
+# Plain-string root for per-request file paths (avoids Path allocation on hot lookups)
+_AGENT_DATA_STR = str(AGENT_DATA_DIR)
 UPBIT_API_BASE = os.environ.get("UPBIT_API_BASE", "https://api.upbit.com")
 QUOTE_CCY = os.environ.get("UPBIT_QUOTE", "KRW").upper()
 CACHE_TTL = float(os.environ.get("API_CACHE_TTL", "5"))
-_CACHE: Dict[str, tuple[float, Any]] = {}
+# Optional cache shared by all dashboard workers (e.g. redis://localhost:6379/0)
+REDIS_URL = os.environ.get("REDIS_URL", "").strip()
+_DAY_URL = f"{UPBIT_API_BASE}/v1/candles/days"
+_TICKER_URL = f"{UPBIT_API_BASE}/v1/ticker"
+
+
+def _build_session() -> requests.Session:
+    """Shared keep-alive session so Upbit calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    # Sized for the shared fetch pool below so parallel candle/ticker calls keep their connections
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+_SESSION = _build_session()
+_HTTP_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="upbit-http")
+# key -> (stored_at, value), least recently used first
+_CACHE: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+_CACHE_MAX = 512
+_CACHE_LOCK = threading.Lock()
+# key -> [lock, callers holding or waiting on it]; bounded on its own and only unused entries are
+# dropped, so evicting a cache entry never hands a second loader a fresh lock for the same key
+_KEY_LOCKS: Dict[str, list] = {}
+_KEY_LOCKS_MAX = 4 * _CACHE_MAX
+
+
+def _store_cached(key: str, value: Any, stored_at: Optional[float] = None) -> None:
+    with _CACHE_LOCK:
+        _CACHE[key] = (time.monotonic() if stored_at is None else stored_at, value)
+        _CACHE.move_to_end(key)
+        if len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+
+
+def _cache_hit(key: str, ttl: float) -> Optional[tuple[float, Any]]:
+    hit = _CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < ttl:
+        try:
+            _CACHE.move_to_end(key)
+        except KeyError:
+            pass  # evicted concurrently; the value we read is still valid
+        return hit
+    return None
+
+
+def _key_lock_acquire(key: str) -> list:
+    with _CACHE_LOCK:
+        entry = _KEY_LOCKS.get(key)
+        if entry is None:
+            if len(_KEY_LOCKS) >= _KEY_LOCKS_MAX:
+                for k in [k for k, e in _KEY_LOCKS.items() if e[1] == 0]:
+                    del _KEY_LOCKS[k]
+            entry = _KEY_LOCKS[key] = [threading.Lock(), 0]
+        entry[1] += 1
+    return entry
+
+
+def _key_lock_release(entry: list) -> None:
+    with _CACHE_LOCK:
+        entry[1] -= 1
+
+
+def _json_body(resp: requests.Response) -> Any:
+    """Decode a response body with orjson when available (falls back to resp.json())."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+_REDIS_CLIENT: Any = None
+_REDIS_PREFIX = "dashboard:"
+
+
+def _shared_cache():
+    """Redis client when REDIS_URL is set and redis is installed, else None."""
+    global _REDIS_CLIENT
+    if _REDIS_CLIENT is None:
+        _REDIS_CLIENT = False
+        if REDIS_URL:
+            # Imported only when configured so workers without REDIS_URL never load it
+            try:
+                import redis
+
+                _REDIS_CLIENT = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5)
+            except Exception:
+                _REDIS_CLIENT = False
+    return _REDIS_CLIENT or None
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _shared_get(key: str, ttl: float) -> Optional[Tuple[float, Any]]:
+    client = _shared_cache()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline()
+        pipe.get(_REDIS_PREFIX + key)
+        pipe.pttl(_REDIS_PREFIX + key)
+        raw, remaining_ms = pipe.execute()
+        if raw is None:
+            return None
+        # Age the local copy so it expires together with the shared entry
+        remaining = max(0.0, (remaining_ms or 0) / 1000.0)
+        return time.monotonic() - max(0.0, ttl - remaining), _loads(raw)
+    except Exception:
+        return None
+
+
+def _shared_set(key: str, value: Any, ttl: float) -> None:
+    client = _shared_cache()
+    if client is None or ttl <= 0:
+        return
+    try:
+        client.set(_REDIS_PREFIX + key, _dumps(value), px=max(1, int(ttl * 1000)))
+    except Exception:
+        pass
 
 
 def _cached(key: str, loader, ttl: Optional[float] = None):
+    """TTL cache with single-flight loading: concurrent misses on a key run loader() once.
+
+    With REDIS_URL set, results are also shared between worker processes.
+    """
     ttl = ttl if ttl is not None else CACHE_TTL
-    now = time.time()
-    hit = _CACHE.get(key)
-    if hit and now - hit[0] < ttl:
+    hit = _cache_hit(key, ttl)
+    if hit:
         return hit[1]
-    value = loader()
-    _CACHE[key] = (now, value)
+    entry = _key_lock_acquire(key)
+    try:
+        with entry[0]:
+            # Another thread may have loaded it while we waited
+            hit = _cache_hit(key, ttl)
+            if hit:
+                return hit[1]
+            shared = _shared_get(key, ttl)
+            if shared is not None:
+                _store_cached(key, shared[1], shared[0])
+                return shared[1]
+            value = loader()
+            _store_cached(key, value)
+            _shared_set(key, value, ttl)
+    finally:
+        _key_lock_release(entry)
     return value
 
 
+def _subdir_names(root: Union[str, Path]) -> List[str]:
+    try:
+        with os.scandir(root) as it:
+            return sorted(entry.name for entry in it if entry.is_dir())
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
 def list_signatures() -> List[str]:
-    if not AGENT_DATA_DIR.exists():
+    return _subdir_names(_AGENT_DATA_STR)
+
+
+# path -> (st_ino, size, mtime_ns, offsets); offsets are line starts, the last entry is the
+# end of the last complete line. Kept in memory only: nothing is written next to the data.
+_LINE_INDEX: Dict[str, Tuple[int, int, int, array]] = {}
+_LINE_INDEX_LOCK = threading.Lock()
+
+
+def _line_offsets(path: str) -> Optional[array]:
+    """Return line start offsets for a JSONL file, indexing only bytes appended since the last call."""
+    key = path
+    try:
+        st = os.stat(key)
+    except OSError:
+        _LINE_INDEX.pop(key, None)
+        return None
+    with _LINE_INDEX_LOCK:
+        hit = _LINE_INDEX.get(key)
+        if hit is not None and hit[0] == st.st_ino and hit[1] == st.st_size and hit[2] == st.st_mtime_ns:
+            return hit[3]
+        offsets = None
+        if hit is not None and hit[0] == st.st_ino and hit[1] < st.st_size:
+            offsets = hit[3]
+        try:
+            with open(key, "rb") as f:
+                if offsets is not None and offsets[-1]:
+                    # Same file grown in place: the indexed prefix must still end on a newline
+                    f.seek(offsets[-1] - 1)
+                    if f.read(1) != b"\n":
+                        offsets = None
+                if offsets is None:
+                    offsets = array("Q", [0])
+                end = offsets[-1]
+                if end < st.st_size:
+                    f.seek(end)
+                    chunk = f.read(st.st_size - end)
+                    pos = chunk.find(b"\n")
+                    while pos >= 0:
+                        offsets.append(end + pos + 1)
+                        pos = chunk.find(b"\n", pos + 1)
+        except OSError:
+            return None
+        _LINE_INDEX[key] = (st.st_ino, st.st_size, st.st_mtime_ns, offsets)
+        return offsets
+
+
+def _loads(line: bytes) -> Any:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _parse_jsonl_bytes(data: bytes) -> List[Dict[str, Any]]:
+    lines = [line for line in data.splitlines() if line]
+    if not lines:
         return []
-    return sorted(
-        entry.name
-        for entry in AGENT_DATA_DIR.iterdir()
-        if entry.is_dir()
-    )
+    try:
+        # Well-formed files parse in one call as a JSON array
+        rows = _loads(b"[" + b",".join(lines) + b"]")
+        if len(rows) == len(lines):
+            return rows
+    except ValueError:
+        pass
+    rows = []
+    for line in lines:
+        try:
+            rows.append(_loads(line))
+        except ValueError:
+            continue
+    return rows
+
+
+# path -> (mtime_ns, size, rows); rows are shared, callers must not mutate them
+_ROWS_CACHE: Dict[str, Tuple[int, int, List[Dict[str, Any]]]] = {}
+_ROWS_CACHE_MAX = 128
 
 
-def _jsonl_rows(path: Path) -> List[Dict[str, Any]]:
-    if not path.exists():
+def _jsonl_rows(path: str) -> List[Dict[str, Any]]:
+    """Parsed JSONL rows, memoized on (mtime_ns, size); appended bytes are parsed incrementally."""
+    key = path
+    try:
+        st = os.stat(key)
+    except OSError:
+        _ROWS_CACHE.pop(key, None)
         return []
-    rows: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    hit = _ROWS_CACHE.get(key)
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+    try:
+        with open(key, "rb") as f:
+            rows = None
+            if hit is not None and 0 < hit[1] < st.st_size:
+                # Append-only growth: the cached prefix must still end on a newline
+                f.seek(hit[1] - 1)
+                if f.read(1) == b"\n":
+                    rows = hit[2] + _parse_jsonl_bytes(f.read(st.st_size - hit[1]))
+            if rows is None:
+                f.seek(0)
+                rows = _parse_jsonl_bytes(f.read(st.st_size))
+    except OSError:
+        return []
+    if len(_ROWS_CACHE) >= _ROWS_CACHE_MAX and key not in _ROWS_CACHE:
+        _ROWS_CACHE.clear()
+    _ROWS_CACHE[key] = (st.st_mtime_ns, st.st_size, rows)
     return rows
 
 
+def _tail_rows(path: str, limit: int) -> List[Dict[str, Any]]:
+    """Parse only the last `limit` records of a JSONL file using the offset index."""
+    hit = _ROWS_CACHE.get(path)
+    if hit is not None:
+        # Already fully parsed and unchanged: slicing beats re-reading the tail
+        try:
+            st = os.stat(path)
+        except OSError:
+            return []
+        if hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2][-limit:]
+    offsets = _line_offsets(path)
+    if offsets is None:
+        return []
+    total = len(offsets) - 1
+    if total <= 0:
+        return []
+    want = limit
+    with open(path, "rb") as f:
+        while True:
+            start = offsets[max(0, total - want)]
+            f.seek(start)
+            rows = _parse_jsonl_bytes(f.read(offsets[-1] - start))
+            # Blank or corrupt lines can leave us short; widen the window and retry
+            if len(rows) >= limit or want >= total:
+                return rows[-limit:]
+            want *= 2
+
+
+_TAIL_CHUNK = 4096
+
+
+def _last_jsonl_row(path: str) -> Optional[Dict[str, Any]]:
+    """Return the last parseable row by reading backwards from the end of the file."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b""
+        while pos > 0:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + carry
+            lines = buf.split(b"\n")
+            # The first piece may be cut mid-line unless we reached the start of the file
+            carry = lines.pop(0) if pos > 0 else b""
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    return _loads(line)
+                except ValueError:
+                    continue
+    return None
+
+
+def _positions_path(signature: str) -> str:
+    return f"{_AGENT_DATA_STR}/{signature}/position/position.jsonl"
+
+
+def _positions_rows(signature: str) -> List[Dict[str, Any]]:
+    """Shared, mtime-cached position rows; read-only for callers."""
+    return _jsonl_rows(_positions_path(signature))
+
+
 def get_positions(signature: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    path = AGENT_DATA_DIR / signature / "position" / "position.jsonl"
-    rows = _cached(f"positions:{signature}", lambda: _jsonl_rows(path))
     if limit is not None and limit > 0:
-        return rows[-limit:].copy()
-    return rows.copy()
+        return _tail_rows(_positions_path(signature), limit)
+    return _positions_rows(signature).copy()
+
+
+_WATCHLIST_CACHE: Optional[Tuple[int, int, List[str]]] = None
 
 
 def _load_watchlist_symbols() -> List[str]:
+    global _WATCHLIST_CACHE
     watch = os.environ.get("WATCHLIST_SYMBOLS")
     if watch:
         return [sym.strip() for sym in watch.split(",") if sym.strip()]
-    if WATCHLIST_FILE.exists():
-        try:
-            data = json.loads(WATCHLIST_FILE.read_text(encoding="utf-8"))
-            symbols = data.get("symbols")
-            if isinstance(symbols, list):
-                return [str(sym) for sym in symbols]
-        except Exception:
-            return []
-    return []
+    try:
+        st = os.stat(WATCHLIST_FILE)
+    except OSError:
+        return []
+    hit = _WATCHLIST_CACHE
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return list(hit[2])
+    symbols: List[str] = []
+    try:
+        data = json.loads(WATCHLIST_FILE.read_text(encoding="utf-8"))
+        raw = data.get("symbols")
+        if isinstance(raw, list):
+            symbols = [str(sym) for sym in raw]
+    except Exception:
+        symbols = []
+    _WATCHLIST_CACHE = (st.st_mtime_ns, st.st_size, symbols)
+    return list(symbols)
 
 
 def latest_position(signature: str) -> Optional[Dict[str, Any]]:
-    rows = get_positions(signature, limit=1)
-    latest = rows[-1] if rows else None
+    latest = _last_jsonl_row(_positions_path(signature))
     if latest:
         watchlist = _load_watchlist_symbols()
         if watchlist:
@@ -86,52 +411,50 @@ def latest_position(signature: str) -> Optional[Dict[str, Any]]:
 
 
 def get_metrics(signature: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    path = AGENT_DATA_DIR / signature / "metrics" / "metrics.jsonl"
-    rows = _jsonl_rows(path)
+    path = f"{_AGENT_DATA_STR}/{signature}/metrics/metrics.jsonl"
     if limit is not None and limit > 0:
-        return rows[-limit:]
-    return rows
+        return _tail_rows(path, limit)
+    return _jsonl_rows(path).copy()
 
 
 def latest_metrics(signature: str) -> Optional[Dict[str, Any]]:
-    rows = get_metrics(signature, limit=1)
-    return rows[-1] if rows else None
+    return _last_jsonl_row(f"{_AGENT_DATA_STR}/{signature}/metrics/metrics.jsonl")
 
 
 def list_log_dates(signature: str) -> List[str]:
-    log_root = AGENT_DATA_DIR / signature / "log"
-    if not log_root.exists():
-        return []
-    dates = [
-        entry.name
-        for entry in log_root.iterdir()
-        if entry.is_dir()
-    ]
-    return sorted(dates)
+    return _subdir_names(f"{_AGENT_DATA_STR}/{signature}/log")
 
 
 def get_log_records(signature: str, date: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    path = AGENT_DATA_DIR / signature / "log" / date / "log.jsonl"
-    rows = _jsonl_rows(path)
+    path = f"{_AGENT_DATA_STR}/{signature}/log/{date}/log.jsonl"
     if limit is not None and limit > 0:
-        return rows[-limit:]
-    return rows
+        return _tail_rows(path, limit)
+    return _jsonl_rows(path).copy()
+
+
+def _latest_cash(latest: Optional[Dict[str, Any]]) -> Optional[float]:
+    if not latest:
+        return None
+    try:
+        return float((latest.get("positions") or {}).get("CASH"))
+    except (TypeError, ValueError):
+        return None
 
 
 def summary() -> Dict[str, Any]:
     signatures = list_signatures()
-    overview: List[Dict[str, Any]] = []
-    for sig in signatures:
-        latest = latest_position(sig)
-        cash = None
-        if latest:
-            cash_value = latest.get("positions", {}).get("CASH")
-            if isinstance(cash_value, (int, float)):
-                cash = float(cash_value)
-        overview.append({"signature": sig, "latest_cash": cash})
+    if len(signatures) > 1:
+        latests = list(_HTTP_POOL.map(latest_position, signatures))
+    else:
+        latests = [latest_position(sig) for sig in signatures]
+    overview = [
+        {"signature": sig, "latest_cash": _latest_cash(latest)}
+        for sig, latest in zip(signatures, latests)
+    ]
     return {"signatures": signatures, "overview": overview}
 
 
+@functools.lru_cache(maxsize=1024)
 def _normalize_market(symbol: str) -> str:
     s = symbol.strip().upper()
     if "-" in s:
@@ -140,23 +463,69 @@ def _normalize_market(symbol: str) -> str:
 
 
 _price_cache: Dict[tuple[str, str], float] = {}
+_PRICE_DB: Optional[sqlite3.Connection] = None
+_PRICE_DB_LOCK = threading.Lock()
+_PRICE_DB_LOADED = False
+_KST = timezone(timedelta(hours=9))
+
+
+def _price_db() -> Optional[sqlite3.Connection]:
+    """Open the on-disk daily close cache once, seeding _price_cache from it."""
+    global _PRICE_DB, _PRICE_DB_LOADED
+    if _PRICE_DB_LOADED:
+        return _PRICE_DB
+    with _PRICE_DB_LOCK:
+        if _PRICE_DB_LOADED:
+            return _PRICE_DB
+        try:
+            conn = sqlite3.connect(str(PRICE_DB_FILE), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily("
+                "symbol TEXT, date TEXT, close REAL, PRIMARY KEY(symbol, date))"
+            )
+            for symbol, date, close in conn.execute("SELECT symbol, date, close FROM daily"):
+                _price_cache.setdefault((symbol, date), float(close))
+            _PRICE_DB = conn
+        except sqlite3.Error:
+            _PRICE_DB = None
+        _PRICE_DB_LOADED = True
+    return _PRICE_DB
+
+
+def _persist_closes(symbol: str, closes: Dict[str, float]) -> None:
+    """Store settled (before today KST), non-zero closes; today's candle is still moving."""
+    today = datetime.now(tz=_KST).date().isoformat()
+    rows = [(symbol, d, px) for d, px in closes.items() if px > 0 and d < today]
+    conn = _price_db()
+    if conn is None or not rows:
+        return
+    with _PRICE_DB_LOCK:
+        try:
+            conn.executemany("INSERT OR REPLACE INTO daily(symbol, date, close) VALUES (?, ?, ?)", rows)
+            conn.commit()
+        except sqlite3.Error:
+            pass
 
 
 def _get_daily_close(symbol: str, date: str) -> float:
     """Fetch Upbit daily candle close for date (uses public API; cached per symbol/date)."""
     key = (symbol, date)
+    if key in _price_cache:
+        return _price_cache[key]
+    _price_db()
     if key in _price_cache:
         return _price_cache[key]
     market = _normalize_market(symbol)
-    url = f"{UPBIT_API_BASE}/v1/candles/days"
     params = {"market": market, "to": f"{date} 23:59:59", "count": 1}
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _SESSION.get(_DAY_URL, params=params, timeout=10)
         if resp.status_code == 200:
-            arr = resp.json()
+            arr = _json_body(resp)
             if isinstance(arr, list) and arr:
                 close_px = float(arr[0].get("trade_price") or 0.0)
                 _price_cache[key] = close_px
+                _persist_closes(symbol, {date: close_px})
                 return close_px
     except Exception:
         pass
@@ -164,66 +533,168 @@ def _get_daily_close(symbol: str, date: str) -> float:
     return 0.0
 
 
+_CANDLE_MAX_COUNT = 200  # Upbit /v1/candles/days page size limit
+
+
+def _fetch_daily_closes(symbol: str, last_date: str, count: int) -> Optional[Dict[str, float]]:
+    """Return {YYYY-MM-DD: close} for `count` daily candles ending at last_date, or None on failure."""
+    params = {"market": _normalize_market(symbol), "to": f"{last_date} 23:59:59", "count": count}
+    try:
+        resp = _SESSION.get(_DAY_URL, params=params, timeout=10)
+        if resp.status_code != 200:
+            return None
+        arr = _json_body(resp)
+        if not isinstance(arr, list):
+            return None
+        return {
+            str(c.get("candle_date_time_kst", ""))[:10]: float(c.get("trade_price") or 0.0)
+            for c in arr
+        }
+    except Exception:
+        return None
+
+
+def _prefetch_daily_closes(symbol: str, dates: set) -> None:
+    """Fill _price_cache for many dates of one symbol with as few candle requests as possible."""
+    try:
+        first = _date.fromisoformat(min(dates))
+        end = _date.fromisoformat(max(dates))
+    except (TypeError, ValueError):
+        return  # unusual date strings fall back to per-date lookups
+    while end >= first:
+        count = min(_CANDLE_MAX_COUNT, (end - first).days + 1)
+        closes = _fetch_daily_closes(symbol, end.isoformat(), count)
+        if closes is None:
+            return
+        _persist_closes(symbol, closes)
+        start = end - timedelta(days=count - 1)
+        lo, hi = start.isoformat(), end.isoformat()
+        for d in dates:
+            if lo <= d <= hi:
+                # No candle inside a fetched window means no trading data for that day
+                _price_cache[(symbol, d)] = closes.get(d, 0.0)
+        end = start - timedelta(days=1)
+
+
+def _held_symbols(positions: Dict[str, Any]) -> List[tuple[str, float]]:
+    held = []
+    for sym, qty in positions.items():
+        if sym == "CASH":
+            continue
+        try:
+            qty_val = float(qty or 0.0)
+        except Exception:
+            qty_val = 0.0
+        if qty_val > 0:
+            held.append((sym, qty_val))
+    return held
+
+
 def portfolio_timeseries(signature: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    """Return equity timeseries using paper-trade position snapshots and Upbit public prices."""
+    """Return equity timeseries using paper-trade position snapshots and Upbit public prices.
+
+    One point per position row. Before the candle batching change the append sat outside the
+    row loop, so only the last row was returned.
+    """
 
     def _loader():
         rows = get_positions(signature, limit=limit)
-        series: List[Dict[str, Any]] = []
-        for row in rows:
-            date = row.get("date")
-            positions = row.get("positions", {}) or {}
-            cash = float(positions.get("CASH", 0.0) or 0.0)
-            equity = cash
-            for sym, qty in positions.items():
-                if sym == "CASH":
-                    continue
-                try:
-                    qty_val = float(qty or 0.0)
-                except Exception:
-                    qty_val = 0.0
-                if qty_val <= 0:
-                    continue
-                px = _get_daily_close(sym, date)
-                equity += qty_val * px
-        series.append({
-            "date": date,
-            "timestamp": row.get("timestamp"),
-            "equity": equity,
-            "cash": cash,
-            "realized_pnl": float(row.get("realized_pnl", 0.0) or 0.0),
-        })
+        # Each row's date is looked up once and reused as the price-cache key below
+        dates = [row.get("date") for row in rows]
+        held_by_row = [_held_symbols(row.get("positions", {}) or {}) for row in rows]
+
+        _price_db()
+        # One candle request per symbol (per 200 days) instead of one per (row, symbol)
+        wanted: Dict[str, set] = {}
+        for date, held in zip(dates, held_by_row):
+            if not isinstance(date, str):
+                continue
+            for sym, _ in held:
+                if (sym, date) not in _price_cache:
+                    wanted.setdefault(sym, set()).add(date)
+        if len(wanted) == 1:
+            _prefetch_daily_closes(*next(iter(wanted.items())))
+        elif wanted:
+            list(_HTTP_POOL.map(lambda item: _prefetch_daily_closes(*item), wanted.items()))
+
+        price_of = _price_cache.get
+
+        def _holdings_value(held: List[tuple[str, float]], date: Any) -> float:
+            total = 0.0
+            for sym, qty_val in held:
+                px = price_of((sym, date))
+                if px is None:
+                    px = _get_daily_close(sym, date)
+                total += qty_val * px
+            return total
+
+        cash_col = [float((row.get("positions", {}) or {}).get("CASH", 0.0) or 0.0) for row in rows]
+        value_col = [_holdings_value(held, date) for date, held in zip(dates, held_by_row)]
+        series: List[Dict[str, Any]] = [
+            {
+                "date": date,
+                "timestamp": row.get("timestamp"),
+                "equity": cash + value,
+                "cash": cash,
+                "realized_pnl": float(row.get("realized_pnl", 0.0) or 0.0),
+            }
+            for row, date, cash, value in zip(rows, dates, cash_col, value_col)
+        ]
         return series
 
     cache_key = f"portfolio:{signature}:{limit}"
     return _cached(cache_key, _loader)
 
 
+_TICKER_CHUNK = 50
+
+
+def _ticker_prices_slow(data: List[Any]) -> Dict[str, float]:
+    prices: Dict[str, float] = {}
+    for item in data:
+        m = item.get("market", "")
+        sym = m.split("-", 1)[1] if "-" in m else m
+        try:
+            prices[sym] = float(item.get("trade_price") or 0.0)
+        except Exception:
+            prices[sym] = 0.0
+    return prices
+
+
+def _ticker_chunk(batch: List[str]) -> Dict[str, float]:
+    try:
+        resp = _SESSION.get(_TICKER_URL, params={"markets": ",".join(batch)}, timeout=10)
+        if resp.status_code != 200:
+            return {}
+        data = _json_body(resp)
+    except Exception:
+        return {}
+    if not isinstance(data, list):
+        return {}
+    try:
+        return {
+            item["market"].partition("-")[2] or item["market"]: float(item.get("trade_price") or 0.0)
+            for item in data
+        }
+    except Exception:
+        # Odd rows (missing market, non-numeric price): fall back to the per-item path
+        return _ticker_prices_slow(data)
+
+
 def _ticker_batch(symbols: List[str]) -> Dict[str, float]:
-    """Fetch latest trade_price per symbol (KRW market)."""
+    """Fetch latest trade_price per symbol (KRW market).
+
+    One /v1/ticker call covers up to 50 markets; larger lists are fetched in parallel.
+    """
     prices: Dict[str, float] = {}
     if not symbols:
         return prices
     markets = [_normalize_market(sym) for sym in symbols]
-    url = f"{UPBIT_API_BASE}/v1/ticker"
-    # batch up to 50
-    for i in range(0, len(markets), 50):
-        batch = markets[i:i+50]
-        try:
-            resp = requests.get(url, params={"markets": ",".join(batch)}, timeout=10)
-            if resp.status_code != 200:
-                continue
-            data = resp.json()
-            if isinstance(data, list):
-                for item in data:
-                    m = item.get("market", "")
-                    sym = m.split("-", 1)[1] if "-" in m else m
-                    try:
-                        prices[sym] = float(item.get("trade_price") or 0.0)
-                    except Exception:
-                        prices[sym] = 0.0
-        except Exception:
-            continue
+    batches = [markets[i:i + _TICKER_CHUNK] for i in range(0, len(markets), _TICKER_CHUNK)]
+    if len(batches) == 1:
+        return _ticker_chunk(batches[0])
+    for part in _HTTP_POOL.map(_ticker_chunk, batches):
+        prices.update(part)
     return prices
 
 
@@ -274,7 +745,7 @@ def _get_initial_cash(signature: str) -> float:
 
 def get_trade_actions(signature: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """Return buy/sell actions with timestamp and fill data."""
-    rows = get_positions(signature)
+    rows = _positions_rows(signature)
     actions: List[Dict[str, Any]] = []
     for row in rows:
         action = row.get("this_action") or {}
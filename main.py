@@ -1,9 +1,19 @@
 import os
+import sys
 import asyncio
-from datetime import datetime, timedelta
+import copy
+import functools
+import importlib
+from datetime import date, datetime, timedelta
 import json
+import mmap
+import time
 from pathlib import Path
 from dotenv import load_dotenv
+try:
+    import orjson
+except Exception:
+    orjson = None
 try:
     # Ensure we load the .env next to this script regardless of CWD
     load_dotenv(Path(__file__).parent / ".env")
@@ -25,9 +35,28 @@ except Exception:
     get_kst_today_str = None
 
 
+def _emit(*lines: str) -> None:
+    """Write a block of status lines with one write and one flush."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+_TRUTHY = frozenset(("1", "true", "yes"))
+_UPBIT_UNIVERSES = frozenset(("upbit_krw", "upbit_all_krw", "upbit_all"))
+
+
+def _is_truthy(value) -> bool:
+    return str(value).lower() in _TRUTHY
+
+
 def _resolve_bar_minutes_env(default: int = 60) -> int:
     """Resolve bar size from env (UPBIT_BAR or UPBIT_BAR_MINUTES)."""
-    raw = os.getenv("UPBIT_BAR")
+    return _parse_bar_minutes(os.getenv("UPBIT_BAR"), os.getenv("UPBIT_BAR_MINUTES"), default)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_bar_minutes(raw, v2, default: int) -> int:
+    """Parse the raw env strings once; memoized on their values."""
     if raw:
         v = raw.strip().lower()
         if v.endswith("m") and v[:-1].isdigit():
@@ -36,7 +65,6 @@ def _resolve_bar_minutes_env(default: int = 60) -> int:
             return max(1, int(v[:-1]) * 60)
         if v.isdigit():
             return max(1, int(v))
-    v2 = os.getenv("UPBIT_BAR_MINUTES")
     if v2 and v2.isdigit():
         return max(1, int(v2))
     return default
@@ -77,23 +105,149 @@ def get_agent_class(agent_type):
             f"   Supported types: {supported_types}"
         )
     
+    misses = _load_agent_class.cache_info().misses
+    agent_class = _load_agent_class(agent_type)
+    if _load_agent_class.cache_info().misses != misses:
+        print(f"✅ Successfully loaded Agent class: {agent_type} (from {AGENT_REGISTRY[agent_type]['module']})")
+    return agent_class
+
+
+@functools.lru_cache(maxsize=None)
+def _load_agent_class(agent_type):
+    """Import the registered agent class once; scheduler iterations reuse it."""
     agent_info = AGENT_REGISTRY[agent_type]
     module_path = agent_info["module"]
     class_name = agent_info["class"]
-    
+
     try:
         # Dynamic import module
-        import importlib
         module = importlib.import_module(module_path)
-        agent_class = getattr(module, class_name)
-        print(f"✅ Successfully loaded Agent class: {agent_type} (from {module_path})")
-        return agent_class
+        return getattr(module, class_name)
     except ImportError as e:
         raise ImportError(f"❌ Unable to import agent module {module_path}: {e}")
     except AttributeError as e:
         raise AttributeError(f"❌ Class {class_name} not found in module {module_path}: {e}")
 
 
+def _fast_iso_date(s: str) -> date:
+    """Parse YYYY-MM-DD by slicing; strptime only for anything else."""
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and (s[:4] + s[5:7] + s[8:]).isdigit():
+        try:
+            return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+        except ValueError:
+            pass
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+_SMALL_FILE = 4096
+
+
+def _last_position_record(pos_file):
+    """Return the last valid record of position.jsonl, reading only the file tail."""
+    try:
+        size = os.stat(pos_file).st_size
+    except OSError:
+        return None
+    if size == 0:
+        return None
+    try:
+        if size < _SMALL_FILE:
+            # A single read is cheaper than mapping a small file
+            with open(pos_file, "rb") as f:
+                line = f.read().rstrip().rsplit(b"\n", 1)[-1]
+            if not line.strip():
+                return None
+            return orjson.loads(line) if orjson is not None else json.loads(line)
+        with open(pos_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Skip trailing blank lines, then take everything after the previous newline
+                end = len(mm)
+                while end > 0 and mm[end - 1:end] in (b"\n", b"\r", b" ", b"\t"):
+                    end -= 1
+                if end == 0:
+                    return None
+                start = mm.rfind(b"\n", 0, end) + 1
+                line = mm[start:end]
+            return orjson.loads(line) if orjson is not None else json.loads(line)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        pass
+    # Corrupt last line: fall back to the last line that parses, walking backwards
+    try:
+        with open(pos_file, "rb") as f:
+            lines = f.read().split(b"\n")
+    except Exception:
+        return None
+    for line in reversed(lines):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            return orjson.loads(line) if orjson is not None else json.loads(line)
+        except Exception:
+            continue
+    return None
+
+
+_SESSION = None
+_TICKER_TTL = 2.0
+# (markets, base) -> (monotonic time, {coin: price})
+_TICKER_CACHE = {}
+
+
+def _http_session():
+    """Keep-alive session reused across scheduler iterations."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _SESSION = requests.Session()
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return _SESSION
+
+
+def _fetch_tickers(markets: tuple, base: str) -> dict:
+    """Current KRW prices per coin for the given markets, cached for _TICKER_TTL seconds."""
+    key = (markets, base)
+    hit = _TICKER_CACHE.get(key)
+    if hit is not None and time.monotonic() - hit[0] < _TICKER_TTL:
+        return dict(hit[1])
+    prices: dict[str, float] = {}
+    try:
+        resp = _http_session().get(f"{base}/v1/ticker", params={"markets": ",".join(markets)}, timeout=5)
+        if resp.status_code == 200:
+            try:
+                data = orjson.loads(resp.content) if orjson is not None else resp.json()
+            except Exception:
+                data = []
+            for item in data if isinstance(data, list) else []:
+                mkt = item.get("market", "")
+                if mkt.startswith("KRW-"):
+                    coin = mkt.split("-", 1)[1]
+                    prices[coin] = float(item.get("trade_price") or 0.0)
+            _TICKER_CACHE[key] = (time.monotonic(), prices)
+    except Exception:
+        pass
+    return dict(prices)
+
+
+@functools.lru_cache(maxsize=4)
+def _watchlist_preview(symbols: tuple) -> str:
+    """Watchlist debug line; scheduler ticks with an unchanged universe reuse the joined text."""
+    watch_count = len(symbols)
+    if watch_count <= 30:
+        names = ", ".join(symbols)
+        return f"👀 현재 top {watch_count} 코인 주시 중입니다: {names}"
+    preview = ", ".join(symbols[:10])
+    return f"👀 현재 top {watch_count} 코인 주시 중입니다. 예: {preview} …"
+
+
+# config path -> ((mtime_ns, size), parsed config)
+_CONFIG_CACHE = {}
+
+
 def load_config(config_path=None):
     """
     Load configuration file from configs directory
@@ -110,15 +264,24 @@ def load_config(config_path=None):
     else:
         config_path = Path(config_path)
     
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except OSError:
         print(f"❌ Configuration file does not exist: {config_path}")
         exit(1)
-    
+
+    # Scheduler loops reload every bar; skip the read/parse while the file is unchanged
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == version:
+        return copy.deepcopy(cached[1])
+
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
         print(f"✅ Successfully loaded configuration file: {config_path}")
-        return config
+        _CONFIG_CACHE[config_path] = (version, config)
+        return copy.deepcopy(config)
     except json.JSONDecodeError as e:
         print(f"❌ Configuration file JSON format error: {e}")
         exit(1)
@@ -149,9 +312,9 @@ async def main(config_path=None):
     END_DATE = config["date_range"]["end_date"]
 
     # Optional: use today's date (KST) for live mode
-    use_today_flag = str(os.getenv("USE_TODAY", str(config.get("use_today", "false")))).lower() in ("1", "true", "yes")
+    use_today_flag = _is_truthy(os.getenv("USE_TODAY", str(config.get("use_today", "false"))))
     if use_today_flag:
-        include_weekends = str(os.getenv("INCLUDE_WEEKENDS", "false")).lower() in ("1", "true", "yes")
+        include_weekends = _is_truthy(os.getenv("INCLUDE_WEEKENDS", "false"))
         # If weekends are allowed (e.g., crypto), use calendar today in KST
         if include_weekends and get_kst_today_str is not None:
             today_kst = get_kst_today_str()
@@ -173,8 +336,8 @@ async def main(config_path=None):
         print(f"⚠️  Using environment variable to override END_DATE: {END_DATE}")
     
     # Validate date range
-    INIT_DATE_obj = datetime.strptime(INIT_DATE, "%Y-%m-%d").date()
-    END_DATE_obj = datetime.strptime(END_DATE, "%Y-%m-%d").date()
+    INIT_DATE_obj = _fast_iso_date(INIT_DATE)
+    END_DATE_obj = _fast_iso_date(END_DATE)
     if INIT_DATE_obj > END_DATE_obj:
         print("❌ INIT_DATE is greater than END_DATE")
         exit(1)
@@ -196,11 +359,13 @@ async def main(config_path=None):
     # Display enabled model information
     model_names = [m.get("name", m.get("signature")) for m in enabled_models]
     
-    print("🚀 Starting trading experiment")
-    print(f"🤖 Agent type: {agent_type}")
-    print(f"📅 Date range: {INIT_DATE} to {END_DATE}")
-    print(f"🤖 Model list: {model_names}")
-    print(f"⚙️  Agent config: max_steps={max_steps}, max_retries={max_retries}, base_delay={base_delay}, initial_cash={initial_cash}")
+    _emit(
+        "🚀 Starting trading experiment",
+        f"🤖 Agent type: {agent_type}",
+        f"📅 Date range: {INIT_DATE} to {END_DATE}",
+        f"🤖 Model list: {model_names}",
+        f"⚙️  Agent config: max_steps={max_steps}, max_retries={max_retries}, base_delay={base_delay}, initial_cash={initial_cash}",
+    )
 
     # Optional startup sleep to allow network/services to settle
     try:
@@ -214,6 +379,7 @@ async def main(config_path=None):
     # Choose symbol universe
     symbols_override = config.get("symbols")
     universe = os.getenv("UPBIT_UNIVERSE", config.get("universe", "nasdaq100"))
+    is_upbit = str(universe).lower() in _UPBIT_UNIVERSES
     # Optional cap on number of symbols (env overrides config)
     try:
         max_symbols = int(os.getenv("MAX_SYMBOLS", str(config.get("max_symbols", 0)) or "0"))
@@ -221,14 +387,13 @@ async def main(config_path=None):
         max_symbols = 0
     # Whether to rank by 24h traded value
     top_by_24h_env = os.getenv("UPBIT_TOP_BY_24H", str(config.get("top_by_24h_value", "false")))
-    top_by_24h = str(top_by_24h_env).lower() in ("1", "true", "yes")
+    top_by_24h = _is_truthy(top_by_24h_env)
 
     watchlist_file = Path(__file__).resolve().parent / "data" / "watchlist.json"
 
     if symbols_override and isinstance(symbols_override, list) and len(symbols_override) > 0:
         symbol_universe = symbols_override
     else:
-        u = universe.lower()
         # Safe KRW fallback set (avoid NASDAQ fallback for crypto mode)
         SAFE_KRW_FALLBACK = [
             "BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "AVAX", "LINK", "MATIC", "TON"
@@ -255,7 +420,7 @@ async def main(config_path=None):
             except Exception:
                 pass
 
-        if u in ("upbit_all_krw", "upbit_all", "upbit_krw"):
+        if is_upbit:
             fetched: list = []
             try:
                 if top_by_24h and get_top_krw_symbols_by_24h_value is not None:
@@ -282,7 +447,6 @@ async def main(config_path=None):
 
     # Debug: print current watchlist each run (does not affect LLM tokens)
     try:
-        watch_count = len(symbol_universe) if isinstance(symbol_universe, list) else 0
         if isinstance(symbol_universe, list):
             os.environ["WATCHLIST_SYMBOLS"] = ",".join(symbol_universe)
             try:
@@ -300,43 +464,20 @@ async def main(config_path=None):
                 )
             except Exception:
                 pass
-            if watch_count <= 30:
-                names = ", ".join(symbol_universe)
-                print(f"👀 현재 top {watch_count} 코인 주시 중입니다: {names}")
-            else:
-                preview = ", ".join(symbol_universe[:10])
-                print(f"👀 현재 top {watch_count} 코인 주시 중입니다. 예: {preview} …")
+            print(_watchlist_preview(tuple(symbol_universe)))
         else:
             print("👀 현재 코인 워치리스트를 불러오지 못했습니다.")
     except Exception:
         pass
 
     # If Upbit universe, optionally print current equity and PnL (disabled by default via PRINT_EQUITY_SUMMARY)
-    try:
-        is_upbit = universe.lower() in ("upbit_krw", "upbit_all_krw", "upbit_all")
-    except Exception:
-        is_upbit = False
-
-    print_equity = str(os.getenv("PRINT_EQUITY_SUMMARY", "false")).lower() in ("1", "true", "yes")
+    print_equity = _is_truthy(os.getenv("PRINT_EQUITY_SUMMARY", "false"))
     if is_upbit and print_equity:
         try:
-            import requests
-
             # Read latest position record for this signature (if exists)
             sig = enabled_models[0].get("signature", "") if enabled_models else ""
             pos_file = Path(__file__).resolve().parent / "data" / "agent_data" / sig / "position" / "position.jsonl"
-            latest = None
-            if pos_file.exists():
-                with pos_file.open("r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            doc = json.loads(line)
-                            latest = doc
-                        except Exception:
-                            continue
+            latest = _last_position_record(pos_file)
 
             if latest and isinstance(latest, dict):
                 positions = latest.get("positions", {}) or {}
@@ -349,47 +490,30 @@ async def main(config_path=None):
                 prices: dict[str, float] = {}
                 if markets:
                     base = os.getenv("UPBIT_API_BASE", "https://api.upbit.com")
-                    url = f"{base}/v1/ticker"
-                    try:
-                        resp = requests.get(url, params={"markets": ",".join(markets)}, timeout=5)
-                        if resp.status_code == 200:
-                            for item in resp.json() if isinstance(resp.json(), list) else []:
-                                mkt = item.get("market", "")
-                                if mkt.startswith("KRW-"):
-                                    coin = mkt.split("-", 1)[1]
-                                    prices[coin] = float(item.get("trade_price") or 0.0)
-                    except Exception:
-                        pass
+                    # Blocking HTTP runs off the event loop
+                    prices = await asyncio.to_thread(_fetch_tickers, tuple(markets), base)
 
                 cash = float(positions.get("CASH", 0.0) or 0.0)
-                equity = cash
-                unreal = 0.0
-                for c in coins:
-                    qty = float(positions.get(c, 0.0) or 0.0)
-                    px = float(prices.get(c, 0.0) or 0.0)
-                    equity += qty * px
-                    avgc = float(avg_costs.get(c, 0.0) or 0.0)
-                    if qty > 0 and avgc > 0 and px > 0:
-                        unreal += (px - avgc) * qty
+                # One pass over holdings: (coin, qty, price, avg cost)
+                holdings = [
+                    (c, float(positions[c]), float(prices.get(c) or 0.0), float(avg_costs.get(c) or 0.0))
+                    for c in coins
+                ]
+                equity = cash + sum(qty * px for _, qty, px, _ in holdings)
+                unreal = sum((px - avgc) * qty for _, qty, px, avgc in holdings if avgc > 0 and px > 0)
 
                 # Baseline for profit rate: initial cash from config
                 init_cash = float(agent_config.get("initial_cash", 10000.0) or 10000.0)
                 pnl_total = equity - init_cash
                 rate = (equity / init_cash - 1.0) * 100.0 if init_cash > 0 else 0.0
-                print(f"📊 현재 평가액: {equity:,.0f} KRW | 손익: {pnl_total:,.0f} KRW (수익률 {rate:.2f}%) | 실현손익 {realized_pnl:,.0f} KRW")
-
-                # Per-coin PnL similar to Upbit app (only non-zero holdings)
-                for c in coins:
-                    qty = float(positions.get(c, 0.0) or 0.0)
-                    if qty <= 0:
-                        continue
-                    px = float(prices.get(c, 0.0) or 0.0)
-                    avgc = float(avg_costs.get(c, 0.0) or 0.0)
-                    eval_val = qty * px
-                    cost_val = qty * avgc
-                    upl = eval_val - cost_val
+                lines = [f"📊 현재 평가액: {equity:,.0f} KRW | 손익: {pnl_total:,.0f} KRW (수익률 {rate:.2f}%) | 실현손익 {realized_pnl:,.0f} KRW"]
+
+                # Per-coin PnL similar to Upbit app (coins is already limited to qty > 0)
+                for c, qty, px, avgc in holdings:
+                    upl = qty * px - qty * avgc
                     rate_c = ((px / avgc) - 1.0) * 100.0 if avgc > 0 and px > 0 else 0.0
-                    print(f"  • {c}: 수량 {qty:.6f}, 평균가 {avgc:,.0f}, 현재가 {px:,.0f}, 평가손익 {upl:,.0f} KRW ({rate_c:+.2f}%)")
+                    lines.append(f"  • {c}: 수량 {qty:.6f}, 평균가 {avgc:,.0f}, 현재가 {px:,.0f}, 평가손익 {upl:,.0f} KRW ({rate_c:+.2f}%)")
+                _emit(*lines)
             else:
                 print("📊 현재 포지션 기록이 없어 평가액/수익률을 계산할 수 없습니다.")
         except Exception:
@@ -412,10 +536,12 @@ async def main(config_path=None):
             print(f"❌ Model {model_name} missing signature field")
             continue
         
-        print("=" * 60)
-        print(f"🤖 Processing model: {model_name}")
-        print(f"📝 Signature: {signature}")
-        print(f"🔧 BaseModel: {basemodel}")
+        _emit(
+            "=" * 60,
+            f"🤖 Processing model: {model_name}",
+            f"📝 Signature: {signature}",
+            f"🔧 BaseModel: {basemodel}",
+        )
         
         # Initialize runtime configuration
         write_config_value("SIGNATURE", signature)
@@ -440,7 +566,7 @@ async def main(config_path=None):
                 base_delay=base_delay,
                 initial_cash=initial_cash,
                 init_date=INIT_DATE,
-                prompt_mode=("upbit" if universe.lower() in ("upbit_krw", "upbit_all_krw", "upbit_all") else "stocks")
+                prompt_mode=("upbit" if is_upbit else "stocks")
             )
             
             print(f"✅ {agent_type} instance created successfully: {agent}")
@@ -453,27 +579,31 @@ async def main(config_path=None):
             
             # Display final position summary
             summary = agent.get_position_summary()
-            print(f"📊 Final position summary:")
-            print(f"   - Latest date: {summary.get('latest_date')}")
-            print(f"   - Total records: {summary.get('total_records')}")
-            print(f"   - Cash balance: ${summary.get('positions', {}).get('CASH', 0):.2f}")
+            _emit(
+                "📊 Final position summary:",
+                f"   - Latest date: {summary.get('latest_date')}",
+                f"   - Total records: {summary.get('total_records')}",
+                f"   - Cash balance: ${summary.get('positions', {}).get('CASH', 0):.2f}",
+            )
             
         except Exception as e:
-            print(f"❌ Error processing model {model_name} ({signature}): {str(e)}")
-            print(f"📋 Error details: {e}")
+            _emit(
+                f"❌ Error processing model {model_name} ({signature}): {str(e)}",
+                f"📋 Error details: {e}",
+            )
             # Can choose to continue processing next model, or exit
             # continue  # Continue processing next model
             exit()  # Or exit program
         
-        print("=" * 60)
-        print(f"✅ Model {model_name} ({signature}) processing completed")
-        print("=" * 60)
+        _emit(
+            "=" * 60,
+            f"✅ Model {model_name} ({signature}) processing completed",
+            "=" * 60,
+        )
     
     print("🎉 All models processing completed!")
     
 if __name__ == "__main__":
-    import sys
-    
     # Support specifying configuration file through command line arguments
     # Usage: python livebaseagent_config.py [config_path]
     # Example: python livebaseagent_config.py configs/my_config.json
@@ -485,7 +615,7 @@ if __name__ == "__main__":
         print(f"📄 Using default configuration file: configs/default_config.json")
     
     # Optional internal scheduler: ENABLE_SCHEDULER=true to loop and align to bar size
-    enable_scheduler = str(os.getenv("ENABLE_SCHEDULER", "false")).lower() in ("1", "true", "yes")
+    enable_scheduler = _is_truthy(os.getenv("ENABLE_SCHEDULER", "false"))
     if enable_scheduler and sleep_until_next_bar_kst is not None:
         # Force today-only safe execution in loop unless explicitly overridden
         os.environ.setdefault("USE_TODAY", "true")
@@ -500,8 +630,8 @@ if __name__ == "__main__":
         if interval_min <= 0:
             interval_min = _resolve_bar_minutes_env(60)
 
-        immediate = str(os.getenv("SCHEDULE_IMMEDIATE_RUN", "true")).lower() in ("1", "true", "yes")
-        align = str(os.getenv("SCHEDULE_ALIGN_TO_BAR", "true")).lower() in ("1", "true", "yes")
+        immediate = _is_truthy(os.getenv("SCHEDULE_IMMEDIATE_RUN", "true"))
+        align = _is_truthy(os.getenv("SCHEDULE_ALIGN_TO_BAR", "true"))
 
         try:
             first = True
@@ -515,7 +645,6 @@ if __name__ == "__main__":
                     sleep_until_next_bar_kst(interval_min)
                 else:
                     # Simple fixed sleep (in seconds)
-                    import time
                     time.sleep(max(60, interval_min * 60))
         except KeyboardInterrupt:
             pass
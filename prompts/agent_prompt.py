@@ -1,12 +1,12 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
+import functools
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 import sys
-import os
 # Add project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
@@ -27,7 +27,8 @@ all_nasdaq_100_symbols = [
     "ON", "BIIB", "LULU", "CDW", "GFS"
 ]
 
-STOP_SIGNAL = "<FINISH_SIGNAL>"
+# Single source for the stop token so both prompt modes and the agent loop agree
+from prompts.agent_prompt_upbit import STOP_SIGNAL
 
 agent_system_prompt = """
 You are a stock fundamental analysis trading assistant.
@@ -71,6 +72,16 @@ When you think your task is complete, output
 {STOP_SIGNAL}
 """
 
+@functools.lru_cache(maxsize=4)
+def _fee_rate_pct(raw: str) -> float:
+    """Fee rate for prompt (default 0.05%), parsed once per distinct FEE_RATE value."""
+    try:
+        fee_rate = float(raw)
+    except Exception:
+        fee_rate = 0.0005
+    return round(fee_rate * 100, 4)
+
+
 def get_agent_system_prompt(today_date: str, signature: str) -> str:
     print(f"signature: {signature}")
     print(f"today_date: {today_date}")
@@ -79,12 +90,7 @@ def get_agent_system_prompt(today_date: str, signature: str) -> str:
     today_buy_price = get_open_prices(today_date, all_nasdaq_100_symbols)
     today_init_position = get_today_init_position(today_date, signature)
     yesterday_profit = get_yesterday_profit(today_date, yesterday_buy_prices, yesterday_sell_prices, today_init_position)
-    # Fee rate for prompt (default 0.05%)
-    try:
-        fee_rate = float(os.environ.get("FEE_RATE", "0.0005"))
-    except Exception:
-        fee_rate = 0.0005
-    fee_rate_pct = round(fee_rate * 100, 4)
+    fee_rate_pct = _fee_rate_pct(os.environ.get("FEE_RATE", "0.0005"))
     return agent_system_prompt.format(
         date=today_date, 
         positions=today_init_position, 
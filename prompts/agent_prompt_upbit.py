@@ -1,7 +1,7 @@
+import functools
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import re
+import string
 
 STOP_SIGNAL = "<FINISH_SIGNAL>"
 
@@ -24,24 +24,18 @@ Decision summary style:
 Symbols:
 - KRW 마켓 심볼 사용(예: BTC=KRW-BTC로 해석, 또는 KRW-BTC 명시).
 
-Current watchlist (reference only):
-{watchlist}
-
-Prefetched ticker snapshot (KRW):
-{prefetched_tickers}
-
 Position summary (mandatory):
 - "소액"만을 이유로 보유 코인을 무시하지 마세요. 최소 체결금액({min_order_krw} KRW) 이상이면 판단 대상입니다.
 - get_balance()의 balances에서 수량>0 코인만 기준으로 보유 현황을 작성하세요(CASH 제외).
 - 각 코인은 "심볼: 수량 (≈ 평가금액 KRW)" 형식으로 간단히 표기하세요(평가금액 = 최신가 × 수량).
 - 과거 position.jsonl은 코인 "목록" 기준으로 사용하지 말고 avg_costs/realized_pnl 참고용으로만 활용하세요.
 
-Process for each session (KST {date}, current session = {bar_label}):
+Process for each session (날짜는 아래 "Session" 섹션, current session = {bar_label}):
 1) 반드시 get_balance()로 KRW/보유 코인을 먼저 확인합니다.
 2) 의사결정 전 반드시 가격 데이터 호출:
    - get_ticker_batch()로 워치리스트 현재가 스냅샷 확보.
    - 관심 상위 3개 내외 심볼은 get_price_minutes(symbol, minutes={bar_minutes}, count={bar_count})로 분봉 추세 확인.
-   - 필요 시 get_price_local(symbol, "{date}")로 일봉 컨텍스트 보완.
+   - 필요 시 get_price_local(symbol, "<세션 날짜>")로 일봉 컨텍스트 보완.
 3) 매수/매도 결정을 내립니다(도구를 통해 실행).
    - 시장가 매수: market_order=True, price=집행할 KRW 금액(업비트 ord_type='price').
    - 시장가 매도: market_order=True, amount=코인 수량(업비트 ord_type='market').
@@ -68,69 +62,200 @@ Interest summary:
 - 행동 리스트는 최대 3개 심볼에 대해서만 출력(한국어만 사용).
   - 형식: "심볼 | 조치(매수/매도/보유 유지/보류) | 이유: (10~15자 한국어)"
   - "보유 유지"에도 간단한 이유를 포함하세요.
+<!-- cache-checkpoint -->
+Session (KST):
+- 세션 날짜: {date}
+
+Current watchlist (reference only):
+{watchlist}
 
 작업을 마치면 마지막 줄에 정확히 다음 토큰만 출력하세요:
 {STOP_SIGNAL}
 """
 
+# 이 표식 앞은 프로세스 내내 바이트 단위로 동일(프롬프트 캐시 대상), 뒤는 날짜/워치리스트처럼 호출마다 바뀌는 부분.
+# 종료 토큰 규칙은 프롬프트의 마지막 문장이어야 하므로 세션 섹션 끝에만 둠
+_CACHE_CHECKPOINT = "<!-- cache-checkpoint -->\n"
+
+
+def _parse_template(src: str) -> tuple:
+    """(조각 리스트, (필드 위치, 필드명, 서식, 변환) 튜플)로 분해. {{ }} 이스케이프도 str.format과 동일하게 처리."""
+    chunks: list = []
+    slots = []
+    for literal, field, spec, conv in string.Formatter().parse(src):
+        if literal:
+            chunks.append(literal)
+        if field is not None:
+            if "{" in spec:
+                raise ValueError(f"nested format spec is not supported: {{{field}:{spec}}}")
+            slots.append((len(chunks), field, spec, conv))
+            chunks.append(None)
+    return chunks, tuple(slots)
+
+
+# 축약 변형: 결정 형식/집행 규칙만 남긴 짧은 규칙(세션 정보 섹션과 종료 토큰 규칙은 전체 변형과 동일)
+_COMPACT_RULES = """
+당신은 업비트(KRW 마켓)에서 동작하는 암호화폐 트레이딩 보조 에이전트입니다. 최종 출력은 모두 한국어로 작성하세요.
+
+Rules:
+- 반드시 get_balance()로 KRW/보유 코인을 확인하고, 하나 이상의 가격 도구(get_ticker_batch/get_price_minutes)를 호출한 뒤 결정합니다.
+- 직접 명령을 출력하지 말고 도구를 호출해 실행하세요. 최소 체결금액은 {min_order_krw} KRW, 수수료는 {fee_rate_pct}%입니다.
+- 시점 표현은 "{bar_label}" 기준으로 하고 "오늘" 대신 현재 봉 기준으로 표현합니다.
+
+Decision summary style:
+- "근거:" 섹션(2~3개 불릿) 뒤에 "결정:"으로 시작하는 한 줄 결론을 반드시 포함합니다.
+- 결정 라인에는 도구가 보고한 실제 집행 금액(매수 krw_spent, 매도 proceeds_krw)을 사용하세요.
+"""
+
+
+def _compact_whitespace(src: str) -> str:
+    """토큰만 차지하는 공백 정리: 줄 끝 공백 제거, 3줄 이상 빈 줄은 한 줄로."""
+    return re.sub(r"\n{3,}", "\n\n", re.sub(r"[ \t]+\n", "\n", src))
+
+
+# 변형 이름 -> 원본 템플릿. 파싱은 해당 변형을 처음 쓸 때 한 번만 수행
+_TEMPLATES = {
+    "full": agent_system_prompt,
+    "compact": _COMPACT_RULES + _CACHE_CHECKPOINT + agent_system_prompt.split(_CACHE_CHECKPOINT)[1],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _template_parts(variant: str) -> tuple:
+    """(static_parts, dynamic_parts). 분할 중간 문자열은 파싱 후 버려 템플릿 사본을 상주시키지 않음."""
+    # 종료 토큰은 런타임에 바뀌지 않으므로 파싱 전에 리터럴로 고정(중괄호는 이스케이프)
+    src = _TEMPLATES[variant].replace("{STOP_SIGNAL}", STOP_SIGNAL.replace("{", "{{").replace("}", "}}"))
+    static_src, dynamic_src = src.split(_CACHE_CHECKPOINT)
+    return _parse_template(_compact_whitespace(static_src).lstrip("\n")), _parse_template(_compact_whitespace(dynamic_src))
+
+
+# str.format의 !r/!s/!a 변환
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+def _render_prompt(parts: tuple, values: dict) -> str:
+    """src.format(**values)와 동일한 결과를 재파싱 없이 생성: 리터럴은 그대로 두고 필드 자리만 채움."""
+    chunks, slots = parts
+    out = chunks.copy()
+    for i, field, spec, conv in slots:
+        value = values[field]
+        if conv is not None:
+            value = _CONVERSIONS[conv](value)
+        out[i] = format(value, spec)
+    return "".join(out)
+
 
-def _resolve_bar_minutes() -> int:
-    """분봉 크기를 환경변수에서 해석(예: 10m, 60m, 4h 또는 정수 분)."""
-    raw = os.environ.get("UPBIT_BAR")
+def _parse_bar_minutes(raw: str | None, v2: str | None) -> int:
     if raw:
         v = raw.strip().lower()
-        if v.endswith("m") and v[:-1].isdigit():
-            return max(1, int(v[:-1]))
-        if v.endswith("h") and v[:-1].isdigit():
-            return max(1, int(v[:-1]) * 60)
         if v.isdigit():
             return max(1, int(v))
-    v2 = os.environ.get("UPBIT_BAR_MINUTES")
+        # 단위 접미사(m/h)는 한 번만 잘라서 검사
+        n, unit = v[:-1], v[-1:]
+        if unit in ("m", "h") and n.isdigit():
+            return max(1, int(n) * (60 if unit == "h" else 1))
     if v2 and v2.isdigit():
         return max(1, int(v2))
     return 10
 
 
-def get_agent_system_prompt_upbit(today_date: str, signature: str, symbols: list | None = None, prefetched_tickers: str | None = None) -> str:
-    bar_minutes = _resolve_bar_minutes()
-    bar_count_env = os.environ.get("UPBIT_BAR_COUNT")
+@functools.lru_cache(maxsize=1)
+def _resolved_prompt_settings() -> tuple:
+    """(bar_minutes, bar_count, bar_label, fee_rate_pct, min_order_krw). 프로세스당 한 번만 읽음."""
+    env = os.environ
+    # 분봉 크기(예: 10m, 60m, 4h 또는 정수 분)
+    bar_minutes = _parse_bar_minutes(env.get("UPBIT_BAR"), env.get("UPBIT_BAR_MINUTES"))
+    return (bar_minutes,) + _parse_prompt_env(
+        bar_minutes,
+        env.get("UPBIT_BAR_COUNT"),
+        env.get("FEE_RATE", "0.0005"),
+        env.get("MIN_ORDER_KRW", "5000"),
+    )
+
+
+def _reset_env_cache() -> None:
+    """환경변수를 바꾼 뒤(예: .env 재로드, 테스트) 다시 해석하도록 캐시를 비움."""
+    _resolved_prompt_settings.cache_clear()
+
+
+def _parse_prompt_env(bar_minutes: int, bar_count_env: str | None, fee_env: str, min_order_env: str) -> tuple:
+    """환경변수 원본 문자열에서 (bar_count, bar_label, fee_rate_pct, min_order_krw) 해석."""
     try:
         bar_count = max(1, int(bar_count_env)) if bar_count_env and bar_count_env.isdigit() else 30
-    except Exception:
+    except ValueError:
         bar_count = 30
 
     # 바 라벨(예: "60분봉" 또는 "4시간봉")
     if bar_minutes >= 60 and bar_minutes % 60 == 0:
-        hours = bar_minutes // 60
-        bar_label = f"{hours}시간봉"
+        bar_label = f"{bar_minutes // 60}시간봉"
     else:
         bar_label = f"{bar_minutes}분봉"
 
     # 수수료 표기(기본 0.05%)
-    try:
-        fee_rate = float(os.environ.get("FEE_RATE", "0.0005"))
-    except Exception:
-        fee_rate = 0.0005
-    fee_rate_pct = round(fee_rate * 100, 4)
-
+    fee_rate_pct = round(_parse_float(fee_env, 0.0005) * 100, 4)
     # 최소 체결금액(필수 가이드)
+    min_order_krw = int(_parse_float(min_order_env, 5000.0))
+    return bar_count, bar_label, fee_rate_pct, min_order_krw
+
+
+def _parse_float(raw: str | None, default: float) -> float:
     try:
-        min_order = float(os.environ.get("MIN_ORDER_KRW", "5000"))
-    except Exception:
-        min_order = 5000.0
-    min_order_krw = int(min_order)
-
-    watchlist = ", ".join(symbols) if isinstance(symbols, list) else ""
-    prefetched = prefetched_tickers or ""
-    return agent_system_prompt.format(
-        date=today_date,
-        STOP_SIGNAL=STOP_SIGNAL,
+        return float(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+def get_agent_system_prompt_upbit(today_date: str, signature: str, symbols: list | tuple | None = None, compact: bool = False) -> str:
+    """정적 규칙 + 세션 정보를 합친 시스템 프롬프트(캐시 경계가 필요하면 get_agent_system_prompt_upbit_parts 사용).
+
+    compact=True면 규칙을 결정 형식/집행 규칙/종료 토큰으로 줄인 짧은 변형을 사용합니다.
+    """
+    variant = "compact" if compact else "full"
+    settings = _resolved_prompt_settings()
+    # tuple()은 이미 튜플이면 그대로 반환하므로 세션 동안 같은 튜플을 넘기면 복사도 없음
+    symbols_key = tuple(symbols) if symbols is not None else None
+    return _build_prompt(variant, today_date, symbols_key, *settings)
+
+
+def get_agent_system_prompt_upbit_parts(today_date: str, signature: str, symbols: list | tuple | None = None, compact: bool = False) -> tuple[str, str]:
+    """(static_prefix, dynamic_suffix). prefix는 프로세스 내내 동일하므로 제공자 프롬프트 캐시(cache_control 등)에 표시하기 좋음.
+
+    두 문자열을 이어 붙이면 get_agent_system_prompt_upbit()와 같습니다.
+    """
+    full = get_agent_system_prompt_upbit(today_date, signature, symbols, compact)
+    static = _static_prompt("compact" if compact else "full", *_resolved_prompt_settings())
+    return static, full[len(static):]
+
+
+@functools.lru_cache(maxsize=8)
+def _static_prompt(variant: str, bar_minutes: int, bar_count: int, bar_label: str, fee_rate_pct: float, min_order_krw: int) -> str:
+    return _render_prompt(_template_parts(variant)[0], dict(
         bar_minutes=bar_minutes,
         bar_count=bar_count,
         bar_label=bar_label,
         fee_rate_pct=fee_rate_pct,
-        watchlist=watchlist,
-        prefetched_tickers=prefetched,
         min_order_krw=min_order_krw,
-    )
+    ))
+
+
+@functools.lru_cache(maxsize=128)
+def _build_prompt(variant: str, today_date: str, symbols: tuple | None, bar_minutes: int, bar_count: int,
+                  bar_label: str, fee_rate_pct: float, min_order_krw: int) -> str:
+    """같은 입력으로 다시 호출되면 렌더링된 문자열을 재사용."""
+    watchlist = ", ".join(symbols) if symbols is not None else ""
+    dynamic = _render_prompt(_template_parts(variant)[1], dict(
+        date=today_date,
+        watchlist=watchlist,
+    ))
+    return _static_prompt(variant, bar_minutes, bar_count, bar_label, fee_rate_pct, min_order_krw) + dynamic
+
+
+def get_agent_dynamic_context(today_date: str, prefetched_tickers: str | None = None) -> str:
+    """분 단위로 바뀌는 티커 스냅샷 텍스트(없으면 빈 문자열).
 
+    시스템 프롬프트에 넣으면 prefix가 매번 달라져 제공자 프롬프트 캐시가 깨지므로,
+    user 메시지로 따로 보내세요.
+    """
+    if not prefetched_tickers:
+        return ""
+    return f"Prefetched ticker snapshot (KRW, KST {today_date}):\n{prefetched_tickers}"
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import agent_prompt_upbit as prompt  # noqa: E402
+
+_STOP_RULE = "작업을 마치면 마지막 줄에 정확히 다음 토큰만 출력하세요:"
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_stop_rule_appears_once_and_last(compact):
+    out = prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"], compact=compact)
+    assert out.count(_STOP_RULE) == 1
+    assert out.rstrip().endswith(f"{_STOP_RULE}\n{prompt.STOP_SIGNAL}")
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_parts_split_at_the_cache_checkpoint(compact):
+    static, dynamic = prompt.get_agent_system_prompt_upbit_parts("2026-10-15", "sig", ["KRW-BTC"], compact=compact)
+    assert static + dynamic == prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"], compact=compact)
+    assert "2026-10-15" in dynamic and "KRW-BTC" in dynamic
+    other_static, _ = prompt.get_agent_system_prompt_upbit_parts("2026-10-16", "sig", ["KRW-ETH"], compact=compact)
+    assert other_static == static
+    assert "cache-checkpoint" not in static + dynamic
+
+
+@pytest.mark.parametrize("src", [
+    "fee {fee:.2f}% / min {min_krw:,} KRW / {name!r} / {{literal}} / {plain}",
+    "{name!a:>12}|{fee:08.3f}|{plain!s}",
+])
+def test_render_matches_str_format(src):
+    values = {"fee": 0.05, "min_krw": 5000, "name": "업비트", "plain": 7}
+    assert prompt._render_prompt(prompt._parse_template(src), values) == src.format(**values)
+
+
+def test_parse_rejects_nested_spec():
+    with pytest.raises(ValueError):
+        prompt._parse_template("{fee:{width}}")
+
+
+@pytest.fixture
+def fresh_env_cache():
+    prompt._reset_env_cache()
+    yield
+    prompt._reset_env_cache()
+
+
+def test_env_settings_are_reread_after_reset(monkeypatch, fresh_env_cache):
+    monkeypatch.setenv("UPBIT_BAR", "4h")
+    monkeypatch.setenv("UPBIT_BAR_COUNT", "12")
+    monkeypatch.setenv("FEE_RATE", "0.001")
+    monkeypatch.setenv("MIN_ORDER_KRW", "7000")
+    prompt._reset_env_cache()
+    full = prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"])
+    assert "minutes=240, count=12" in full and "4시간봉" in full and "7000 KRW" in full
+    assert "수수료는 0.1%" in prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"], compact=True)
+
+    monkeypatch.setenv("UPBIT_BAR", "15m")
+    assert "4시간봉" in prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"])
+    prompt._reset_env_cache()
+    assert "15분봉" in prompt.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"])
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langchain_mcp_adapters")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.base_agent import base_agent as ba  # noqa: E402
+
+
+class _TickerTool:
+    name = "get_ticker_batch"
+
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, args):
+        self.calls.append(args)
+        return {"results": [{"market": "KRW-BTC", "trade_price": 98765432.0}]}
+
+
+def test_ticker_snapshot_reaches_first_user_message(tmp_path, monkeypatch):
+    agent = ba.BaseAgent("sig", "model", stock_symbols=["KRW-BTC"], log_path=str(tmp_path), prompt_mode="upbit")
+    tool = _TickerTool()
+    agent.tools = [tool]
+    sent = []
+
+    async def fake_invoke(message):
+        sent.append([dict(m) for m in message])
+        return {}
+
+    async def no_result(today_date):
+        return None
+
+    monkeypatch.setattr(ba, "create_agent", lambda *args, **kwargs: object())
+    monkeypatch.setattr(ba, "extract_conversation", lambda response, kind: ba.STOP_SIGNAL)
+    monkeypatch.setattr(agent, "_ainvoke_with_retry", fake_invoke)
+    monkeypatch.setattr(agent, "_get_latest_position_snapshot", lambda today_date: {})
+    monkeypatch.setattr(agent, "_handle_trading_result", no_result)
+
+    asyncio.run(agent.run_trading_session("2026-10-15"))
+
+    assert tool.calls == [{"symbols": ["KRW-BTC"]}]
+    first = sent[0][0]
+    assert first["role"] == "user"
+    assert "Prefetched ticker snapshot (KRW, KST 2026-10-15):" in first["content"]
+    assert json.dumps({"results": [{"market": "KRW-BTC", "trade_price": 98765432.0}]}) in first["content"]
+
+
+def test_no_snapshot_without_ticker_tool(tmp_path, monkeypatch):
+    agent = ba.BaseAgent("sig", "model", stock_symbols=["KRW-BTC"], log_path=str(tmp_path), prompt_mode="upbit")
+    agent.tools = []
+    sent = []
+
+    async def fake_invoke(message):
+        sent.append([dict(m) for m in message])
+        return {}
+
+    async def no_result(today_date):
+        return None
+
+    monkeypatch.setattr(ba, "create_agent", lambda *args, **kwargs: object())
+    monkeypatch.setattr(ba, "extract_conversation", lambda response, kind: ba.STOP_SIGNAL)
+    monkeypatch.setattr(agent, "_ainvoke_with_retry", fake_invoke)
+    monkeypatch.setattr(agent, "_get_latest_position_snapshot", lambda today_date: {})
+    monkeypatch.setattr(agent, "_handle_trading_result", no_result)
+
+    asyncio.run(agent.run_trading_session("2026-10-15"))
+
+    assert sent[0][0]["content"] == "Please analyze and update today's (2026-10-15) positions."
+
+
+class _PromptAgent:
+    def __init__(self, system_prompt):
+        self.system_prompt = system_prompt
+
+
+@pytest.mark.parametrize("flag, compact_later", [("true", True), ("false", False)])
+def test_compact_prompt_only_after_first_turn(tmp_path, monkeypatch, flag, compact_later):
+    monkeypatch.setenv("UPBIT_PROMPT_COMPACT", flag)
+    agent = ba.BaseAgent("sig", "model", stock_symbols=["KRW-BTC"], log_path=str(tmp_path), prompt_mode="upbit")
+    agent.tools = []
+    prompts_seen = []
+
+    async def fake_invoke(message):
+        prompts_seen.append(agent.agent.system_prompt)
+        return {}
+
+    async def no_result(today_date):
+        return None
+
+    replies = iter(["thinking", ba.STOP_SIGNAL])
+    monkeypatch.setattr(ba, "create_agent", lambda model, tools, system_prompt: _PromptAgent(system_prompt))
+    monkeypatch.setattr(ba, "extract_conversation", lambda response, kind: next(replies))
+    monkeypatch.setattr(ba, "extract_tool_messages", lambda response: [])
+    monkeypatch.setattr(agent, "_ainvoke_with_retry", fake_invoke)
+    monkeypatch.setattr(agent, "_get_latest_position_snapshot", lambda today_date: {})
+    monkeypatch.setattr(agent, "_handle_trading_result", no_result)
+
+    asyncio.run(agent.run_trading_session("2026-10-15"))
+
+    full = ba.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"])
+    compact = ba.get_agent_system_prompt_upbit("2026-10-15", "sig", ["KRW-BTC"], compact=True)
+    assert prompts_seen == [full, compact if compact_later else full]
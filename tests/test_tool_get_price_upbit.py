@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("fastmcp")
+pytest.importorskip("requests")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent_tools"))
+
+import tool_get_price_upbit as price  # noqa: E402
+
+
+@pytest.mark.parametrize("date_str", ["2025-01-31", "2024-02-29", "2025-12-01"])
+def test_validate_date_accepts_calendar_dates(date_str):
+    price._validate_date(date_str)
+
+
+@pytest.mark.parametrize("date_str", ["2025-02-30", "2025-02-29", "2025-04-31", "2025-13-01", "2025-00-10", "2025-1-01", "20250101", ""])
+def test_validate_date_rejects_impossible_dates(date_str):
+    with pytest.raises(ValueError):
+        price._validate_date(date_str)
@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("fastmcp")
+pytest.importorskip("requests")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent_tools"))
+
+import tool_trade_paper_upbit as paper  # noqa: E402
+
+_DATE = "2026-10-15"
+
+
+@pytest.fixture
+def ledger_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "sig" / "position" / "position.jsonl")
+    monkeypatch.setattr(paper, "_position_path", lambda signature: path)
+    paper._LEDGER_CACHE.clear()
+    yield path
+    paper._close_ledger_files()
+    paper._LEDGER_CACHE.clear()
+    paper._KNOWN_DIRS.clear()
+
+
+def test_append_recreates_deleted_ledger_dir(ledger_path):
+    paper._bootstrap_if_missing("sig", _DATE)
+    paper._write_snapshot("sig", _DATE, {"CASH": 1.0}, {"action": "buy"})
+    shutil.rmtree(os.path.dirname(os.path.dirname(ledger_path)))
+
+    paper._bootstrap_if_missing("sig", _DATE)
+    positions, _, _, last_id = paper._read_last_ext("sig")
+    assert positions == {"CASH": paper.START_CASH_KRW}
+    assert last_id == 0
+
+
+def _full_parse(path):
+    """Reference result: scan every line of the ledger from scratch."""
+    best = {"id": -1}
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                doc = json.loads(line)
+            except ValueError:
+                continue
+            if int(doc.get("id", -1)) > best["id"]:
+                best = doc
+    return (
+        dict(best.get("positions", {}) or {}),
+        dict(best.get("avg_costs", {}) or {}),
+        float(best.get("realized_pnl", 0.0) or 0.0),
+        int(best["id"]),
+    )
+
+
+def _assert_matches_full_parse(path):
+    expected = _full_parse(path)
+    assert paper._read_last_ext("sig") == expected
+    # A cold process (checkpoint only, no in-memory state) must agree as well
+    paper._LEDGER_CACHE.clear()
+    assert paper._read_last_ext("sig") == expected
+
+
+def _trade(n):
+    return paper._write_snapshot(
+        "sig", _DATE, {"CASH": 1000.0 - n, "BTC": float(n)}, {"action": "buy", "n": n},
+        avg_costs={"BTC": 100.0 + n}, realized_pnl=float(n),
+    )
+
+
+def _raw_append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _rewrite(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    st = os.stat(path)
+    # Make sure the rewrite is visible to the (size, mtime) check even on coarse clocks
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+def _record(i, cash):
+    return json.dumps({"id": i, "positions": {"CASH": cash}, "avg_costs": {}, "realized_pnl": 0.0}) + "\n"
+
+
+def test_incremental_state_matches_full_parse_across_appends(ledger_path):
+    paper._bootstrap_if_missing("sig", _DATE)
+    for n in range(1, 4):
+        _trade(n)
+        _assert_matches_full_parse(ledger_path)
+    # Other writers (no-trade records, registration) append behind the cache's back
+    _raw_append(ledger_path, _record(4, 555.0))
+    _assert_matches_full_parse(ledger_path)
+    _trade(5)
+    _assert_matches_full_parse(ledger_path)
+
+
+def test_partial_trailing_record_is_picked_up_once_complete(ledger_path):
+    paper._bootstrap_if_missing("sig", _DATE)
+    _trade(1)
+    line = _record(2, 42.0)
+    _raw_append(ledger_path, line[:10])
+    _assert_matches_full_parse(ledger_path)
+    _raw_append(ledger_path, line[10:])
+    _assert_matches_full_parse(ledger_path)
+    assert paper._read_last_ext("sig")[3] == 2
+
+
+def test_truncated_or_rewritten_ledger_is_rescanned(ledger_path):
+    paper._bootstrap_if_missing("sig", _DATE)
+    for n in range(1, 4):
+        _trade(n)
+    paper._read_last_ext("sig")
+    _rewrite(ledger_path, _record(0, 7.0))
+    assert paper._read_last_ext("sig") == _full_parse(ledger_path)
+    # Same size, different content
+    _rewrite(ledger_path, _record(0, 8.0))
+    assert paper._read_last_ext("sig") == _full_parse(ledger_path)
+
+
+def test_checkpoint_resumes_cold_reads(ledger_path, monkeypatch):
+    monkeypatch.setattr(paper, "LEDGER_CHECKPOINT_EVERY", 2)
+    paper._bootstrap_if_missing("sig", _DATE)
+    for n in range(1, 4):
+        _trade(n)
+    snap = paper._load_ledger_checkpoint(ledger_path, os.stat(ledger_path).st_size)
+    assert snap is not None and snap["last_id"] == 2
+    _assert_matches_full_parse(ledger_path)
+
+
+def test_stale_checkpoint_is_ignored(ledger_path, monkeypatch):
+    monkeypatch.setattr(paper, "LEDGER_CHECKPOINT_EVERY", 2)
+    paper._bootstrap_if_missing("sig", _DATE)
+    for n in range(1, 4):
+        _trade(n)
+    # Ledger replaced by different (longer) history: the checkpoint no longer describes its prefix
+    _rewrite(ledger_path, "".join(_record(i, 10.0 * i) for i in range(6)))
+    paper._LEDGER_CACHE.clear()
+    _assert_matches_full_parse(ledger_path)
+    # Ledger shorter than the checkpointed prefix
+    _rewrite(ledger_path, _record(0, 1.0))
+    paper._LEDGER_CACHE.clear()
+    _assert_matches_full_parse(ledger_path)
+
+
+@pytest.mark.parametrize("snap", [b"", b"not json", b'{"size": "x"}', b'{"size": 10, "tail": "zz", "last_id": 1}'])
+def test_corrupt_checkpoint_is_ignored(ledger_path, snap):
+    paper._bootstrap_if_missing("sig", _DATE)
+    _trade(1)
+    with open(ledger_path + ".snap", "wb") as f:
+        f.write(snap)
+    paper._LEDGER_CACHE.clear()
+    _assert_matches_full_parse(ledger_path)
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("fastmcp")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent_tools"))
+
+import tool_trade_upbit as upbit  # noqa: E402
+
+
+def _write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def test_read_last_line_skips_partial_trailing_line(tmp_path):
+    path = _write(
+        tmp_path / "position.jsonl",
+        '{"id": 1, "positions": {"CASH": 100.0}}\n'
+        '{"id": 2, "positions": {"CASH": 50.0, "BTC": 0.1}, "avg_costs": {"BTC": 500.0}, "realized_pnl": 3.0}\n'
+        '{"id": 3, "positions": {"CA',
+    )
+    doc = upbit._read_last_line(path)
+    assert doc["id"] == 2
+    assert doc["avg_costs"] == {"BTC": 500.0}
+
+
+def test_read_last_line_spans_block_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(upbit, "_TAIL_CHUNK", 8)
+    path = _write(tmp_path / "position.jsonl", '{"id": 1}\n{"id": 22222}\n{broken\n\n')
+    assert upbit._read_last_line(path) == {"id": 22222}
+
+
+def test_read_last_ext_keeps_cost_basis_after_truncated_append(tmp_path, monkeypatch):
+    path = _write(
+        tmp_path / "position.jsonl",
+        '{"id": 7, "positions": {"CASH": 10.0, "ETH": 2.0}, "avg_costs": {"ETH": 1000.0}, "realized_pnl": 12.5}\n'
+        '{"id": 8, "posit',
+    )
+    monkeypatch.setattr(upbit, "_position_path", lambda signature: path)
+    upbit._LAST_RECORD_CACHE.clear()
+    positions, avg_costs, realized_pnl, last_id = upbit._read_last_ext("sig")
+    assert positions == {"CASH": 10.0, "ETH": 2.0}
+    assert avg_costs == {"ETH": 1000.0}
+    assert realized_pnl == 12.5
+    assert last_id == 7
+
+
+# jwt.io's HS256 reference token
+_REFERENCE_PAYLOAD = {"sub": "1234567890", "name": "John Doe", "iat": 1516239022}
+_REFERENCE_SECRET = "your-256-bit-secret"
+_REFERENCE_TOKEN = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+    ".eyJzdWIiOiIxMjM0NTY3ODkwIiwibmFtZSI6IkpvaG4gRG9lIiwiaWF0IjoxNTE2MjM5MDIyfQ"
+    ".SflKxwRJSMeKKF2QT4fwpMeJf36POk6yJV_adQssw5c"
+)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson":
+        if upbit.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(upbit, "orjson", None)
+    return request.param
+
+
+def _b64decode(part):
+    return base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+
+
+def _check_hs256(token, payload, secret):
+    header_b64, payload_b64, sig_b64 = token.split(".")
+    assert json.loads(_b64decode(header_b64)) == {"alg": "HS256", "typ": "JWT"}
+    assert json.loads(_b64decode(payload_b64)) == payload
+    expected = hmac.new(secret.encode(), f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+    assert _b64decode(sig_b64) == expected
+    try:
+        import jwt
+    except ImportError:
+        return
+    assert token == jwt.encode(payload, secret, algorithm="HS256")
+
+
+def test_encode_jwt_matches_reference_vector(json_backend):
+    assert upbit._encode_jwt(dict(_REFERENCE_PAYLOAD), _REFERENCE_SECRET) == _REFERENCE_TOKEN
+
+
+@pytest.mark.parametrize("query_string", [b"", b"market=KRW-BTC&side=bid&ord_type=price&price=5000"])
+def test_auth_headers_are_valid_hs256(json_backend, query_string):
+    headers = upbit._build_auth_headers("access", "secret", query_string)
+    token = headers["Authorization"].removeprefix("Bearer ")
+    payload = json.loads(_b64decode(token.split(".")[1]))
+    assert payload["access_key"] == "access"
+    if query_string:
+        assert payload["query_hash"] == hashlib.sha512(query_string).hexdigest()
+        assert payload["query_hash_alg"] == "SHA512"
+    else:
+        assert "query_hash" not in payload
+    _check_hs256(token, payload, "secret")
+
+
+def test_auth_headers_use_a_fresh_nonce():
+    first = upbit._build_auth_headers("access", "secret", b"")
+    second = upbit._build_auth_headers("access", "secret", b"")
+    assert first != second